@@ -0,0 +1,6 @@
+"""
+Admin URL Configuration, imported on the first admin request
+"""
+from django.contrib import admin
+
+urlpatterns = admin.site.get_urls()
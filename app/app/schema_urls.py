@@ -0,0 +1,15 @@
+"""
+API schema URL Configuration, imported on the first schema or docs request
+"""
+from core.schema import CachedSpectacularAPIView
+from django.urls import path
+from drf_spectacular.views import SpectacularSwaggerView
+
+urlpatterns = [
+    path("schema/", CachedSpectacularAPIView.as_view(), name="api-schema"),
+    path(
+        "docs/",
+        SpectacularSwaggerView.as_view(url_name="api-schema"),
+        name="api-docs",
+    ),
+]
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import typing as t
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.HealthCheckMiddleware",
+    "core.middleware.PerformanceMetricsMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,7 +83,7 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+DATABASES: dict[str, dict[str, t.Any]] = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "HOST": os.environ.get("DB_HOST"),
@@ -89,6 +93,45 @@ DATABASES = {
     }
 }
 
+# Read replicas, as a comma separated list of hosts sharing the primary's
+# database name and credentials. Quote API reads are sent to a replica
+# unless the user wrote within DATABASE_REPLICA_STICKY_SECONDS
+DATABASE_REPLICAS: list[str] = []
+for i, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(","))
+):
+    DATABASES[f"replica_{i}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{i}")
+
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
+
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# CACHE_HOSTS is a comma separated list of memcached host:port shared by every
+# process. Without it each process has its own cache: the throttles limit each
+# process separately, and reads aren't routed to the replicas since a user's
+# write would only pin the process serving it
+CACHES: dict[str, dict[str, t.Any]] = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if os.environ.get("CACHE_HOSTS"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": [
+            host.strip()
+            for host in os.environ["CACHE_HOSTS"].split(",")
+            if host.strip()
+        ],
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -138,4 +181,60 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Token buckets allowing bursts of up to the rate, see core/throttling.py
+    "DEFAULT_THROTTLE_CLASSES": [
+        "core.throttling.TokenRateThrottle",
+        "core.throttling.IPRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "token": os.environ.get("THROTTLE_RATE_TOKEN", "1200/min"),
+        "ip": os.environ.get("THROTTLE_RATE_IP", "6000/min"),
+    },
 }
+
+# Hours an auth token may go unused before it expires, see the
+# purge_expired_tokens command. Its last use is recorded at most once per
+# AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS so most requests don't write
+AUTH_TOKEN_TTL_HOURS = int(os.environ.get("AUTH_TOKEN_TTL_HOURS", 24 * 30))
+AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS = int(
+    os.environ.get("AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS", 3600)
+)
+
+# Hours an Idempotency-Key is kept for, see the purge_idempotency_keys command
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+# Longest a change feed request may wait for new quote events, and how often
+# it checks for them meanwhile. A waiting request occupies a worker, or a
+# thread with GUNICORN_THREADS
+QUOTE_EVENTS_MAX_WAIT_SECONDS = float(
+    os.environ.get("QUOTE_EVENTS_MAX_WAIT_SECONDS", 20)
+)
+QUOTE_EVENTS_POLL_SECONDS = float(os.environ.get("QUOTE_EVENTS_POLL_SECONDS", 0.5))
+
+# Prebuilt OpenAPI schema served by /api/schema/, generated on the first request
+# when unset. Built into the image by the Dockerfile
+OPENAPI_SCHEMA_FILE = os.environ.get("OPENAPI_SCHEMA_FILE") or None
+
+# Liveness and readiness probes, answered by core.middleware.HealthCheckMiddleware
+# before any other middleware. Readiness pings the database at most once per
+# HEALTH_CHECK_DB_CACHE_SECONDS in each process
+HEALTH_CHECK_LIVENESS_PATH = "/health/live/"
+HEALTH_CHECK_READINESS_PATH = "/health/ready/"
+HEALTH_CHECK_DB_CACHE_SECONDS = float(
+    os.environ.get("HEALTH_CHECK_DB_CACHE_SECONDS", 2)
+)
+
+# Staff-only tracemalloc profiling of the worker serving the request at
+# /debug/memory/, see core.memory. Tracing only runs while a profile is taken
+MEMORY_PROFILING_ENABLED = (
+    os.environ.get("MEMORY_PROFILING_ENABLED", "false").lower() == "true"
+)
+
+# Request performance metrics, exposed in the Prometheus format at /metrics.
+# Server-Timing headers carry the same per-request timings to the client
+PERFORMANCE_METRICS_ENABLED = (
+    os.environ.get("PERFORMANCE_METRICS_ENABLED", "false").lower() == "true"
+)
+PERFORMANCE_SERVER_TIMING = (
+    os.environ.get("PERFORMANCE_SERVER_TIMING", "false").lower() == "true"
+)
@@ -12,21 +12,21 @@ Class-based views
 Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
+
+The admin and API schema URLconfs are given as module paths rather than
+include()d, so they are only imported when a request first resolves into them.
 """
-from django.contrib import admin
+from core.views import MemoryProfileView
+from core.views import metrics_view
 from django.urls import include
 from django.urls import path
-from drf_spectacular.views import SpectacularAPIView
-from drf_spectacular.views import SpectacularSwaggerView
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
-        name="api-docs",
-    ),
+    path("admin/", ("app.admin_urls", "admin", "admin")),
+    path("metrics", metrics_view, name="metrics"),
+    path("debug/memory/", MemoryProfileView.as_view(), name="memory-profile"),
     path("api/user/", include("user.urls")),
     path("api/quote/", include("quote.urls")),
+    # Last so requests to the other API routes never import the schema views
+    path("api/", ("app.schema_urls", None, None)),
 ]
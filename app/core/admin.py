@@ -4,9 +4,51 @@ Django admin customization
 from core import models
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 
+def estimated_row_count(model, using: str) -> int:
+    """Return the planner's estimate of the rows in the model's table
+
+    Sums the estimates of the table's partitions, as autovacuum never analyzes
+    a partitioned table itself.
+    """
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(reltuples) FILTER (WHERE reltuples > 0), 0) "
+            "FROM pg_class WHERE relkind <> 'p' AND (oid = %s::regclass OR oid IN ("
+            "SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass))",
+            [table, table],
+        )
+        return int(cursor.fetchone()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large tables from the planner's estimate
+
+    COUNT(*) scans the whole table, so an unfiltered list uses the row estimate
+    kept up to date by autovacuum instead, and counts exactly only when the
+    estimate is small. A filtered list counts at most `max_count` rows.
+    """
+
+    exact_count_threshold = 10_000
+    max_count = 100_000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate >= self.exact_count_threshold:
+                return estimate
+            return queryset.count()
+        return queryset.order_by()[: self.max_count].count()
+
+
 class UserAdmin(BaseUserAdmin):
     """Define the admin pages for users"""
 
@@ -46,4 +88,34 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class QuoteAdmin(admin.ModelAdmin):
+    """Define the admin pages for quotes
+
+    Built for inspecting a very large table: the list joins the user instead
+    of querying it per row, never runs a full COUNT(*) and only filters on the
+    partition key. Quotes are priced by the API, so they can't be added here
+    and their pricing is read-only.
+    """
+
+    ordering = ["-id"]
+    list_display = ["id", "user", "state", "buyer_last_name", "monthly_total"]
+    list_select_related = ["user"]
+    list_filter = ["state"]
+    raw_id_fields = ["user"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        "state",
+        "flat_cost_coverages",
+        "percentage_cost_coverages",
+        "monthly_subtotal",
+        "monthly_taxes",
+        "monthly_total",
+    ]
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+
 admin.site.register(models.User, UserAdmin)
+admin.site.register(models.Quote, QuoteAdmin)
@@ -0,0 +1,37 @@
+"""
+Authentication classes for the APIs
+"""
+from core import metrics
+from core.models import TokenUsage
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication
+from rest_framework import exceptions
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """Token authentication recording its time in the request metrics
+
+    Tokens expire once left unused for AUTH_TOKEN_TTL_HOURS.
+    """
+
+    def authenticate(self, request):
+        with metrics.timed("auth"):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related("user", "usage").get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        now = timezone.now()
+        if TokenUsage.objects.is_expired(token, now):
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        TokenUsage.objects.touch(token, now)
+
+        return (token.user, token)
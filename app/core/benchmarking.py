@@ -0,0 +1,124 @@
+"""
+Registry and runner for the performance benchmarks
+
+Apps register benchmarks in a `benchmarks` module, which the `benchmark`
+management command discovers and runs.
+"""
+import os
+import platform
+import statistics
+import timeit
+import typing as t
+from dataclasses import dataclass
+from dataclasses import field
+
+
+@dataclass
+class Benchmark:
+    """A benchmark, whose setup returns the callable to time"""
+
+    name: str
+    setup: t.Callable[[], t.Callable[[], t.Any]]
+    database: bool = False
+
+
+@dataclass
+class BenchmarkResult:
+    """Seconds per call measured for each repeat of a benchmark"""
+
+    name: str
+    number: int
+    timings: list[float] = field(default_factory=list)
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+
+@dataclass
+class BenchmarkComparison:
+    """Result of a benchmark compared to its baseline"""
+
+    name: str
+    baseline: float | None
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.baseline:
+            return None
+        return self.current / self.baseline
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio is not None and self.ratio > self.threshold
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, database: bool = False):
+    """Register a benchmark setup function under name
+
+    Set database when the benchmark needs the seeded test database.
+    """
+
+    def decorator(setup: t.Callable[[], t.Callable[[], t.Any]]):
+        BENCHMARKS[name] = Benchmark(name=name, setup=setup, database=database)
+        return setup
+
+    return decorator
+
+
+def run_benchmark(bench: Benchmark, repeat: int = 5) -> BenchmarkResult:
+    """Time the benchmark, calling it enough times for each repeat to take 0.2s"""
+    timer = timeit.Timer(bench.setup())
+    number, _ = timer.autorange()
+    return BenchmarkResult(
+        name=bench.name,
+        number=number,
+        timings=[total / number for total in timer.repeat(repeat, number)],
+    )
+
+
+def machine_id() -> str:
+    """Return what identifies the machine a baseline was measured on
+
+    Made of the CPU model and count and the Python version, rather than the
+    hostname, so containers on the same hardware share their baselines.
+    """
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return (
+        f"{platform.machine()} {cpu_model} x{os.cpu_count()}, "
+        f"{platform.python_implementation()} {'.'.join(platform.python_version_tuple()[:2])}"
+    )
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: dict[str, float],
+    threshold: float,
+) -> list[BenchmarkComparison]:
+    """Compare the median of each result to its baseline median"""
+    return [
+        BenchmarkComparison(
+            name=result.name,
+            baseline=baseline.get(result.name),
+            current=result.median,
+            threshold=threshold,
+        )
+        for result in results
+    ]
@@ -0,0 +1,74 @@
+"""
+Benchmarks for the core request hot paths, run with `manage.py benchmark`
+"""
+import functools
+import threading
+
+from core.benchmarking import benchmark
+from core.jobs import task
+from core.jobs import Worker
+from core.models import Job
+from core.throttling import TokenRateThrottle
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+
+# Jobs queued and run per call of the job throughput benchmarks, divide it by
+# the time per call for jobs/sec
+JOBS_PER_RUN = 200
+JOB_WORKER_COUNTS = (1, 2, 4, 8)
+BENCHMARK_LANE = "benchmark"
+
+
+@benchmark("throttling.token_bucket.allow_request")
+def bench_token_bucket_allow_request():
+    request = Request(RequestFactory().get("/"))
+    request.user = get_user_model()(pk=1)
+    request.auth = Token(key="0" * 40)
+    throttle = TokenRateThrottle()
+    # Large enough that the bucket never empties while timing
+    throttle.num_requests, throttle.duration = 10**12, 1
+    return lambda: throttle.allow_request(request, None)
+
+
+@task("core.benchmark_noop", lane=BENCHMARK_LANE)
+def benchmark_noop(index: int) -> None:
+    """Task doing nothing, so the benchmarks measure the queue itself"""
+
+
+def _run_worker() -> None:
+    """Run the benchmark lane's jobs until none are left"""
+    worker = Worker(lanes=[BENCHMARK_LANE])
+    try:
+        while worker.run_batch():
+            pass
+    finally:
+        connection.close()
+
+
+def _bench_job_throughput(workers: int):
+    def run():
+        Job.objects.bulk_create(
+            Job(task=benchmark_noop.name, lane=BENCHMARK_LANE, payload={"index": i})
+            for i in range(JOBS_PER_RUN)
+        )
+        threads = [threading.Thread(target=_run_worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return run
+
+
+def _register_job_benchmarks() -> None:
+    """Register the job throughput benchmark of each worker count"""
+    for workers in JOB_WORKER_COUNTS:
+        benchmark(f"jobs.run_{JOBS_PER_RUN}.workers_{workers}", database=True)(
+            functools.partial(_bench_job_throughput, workers)
+        )
+
+
+_register_job_benchmarks()
@@ -0,0 +1,90 @@
+"""
+Database router to send reads to the read replicas
+"""
+import contextlib
+import contextvars
+import random
+import typing as t
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Alias of the replica reads are routed to, set for the duration of a request
+_replica_alias: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "replica_alias", default=None
+)
+
+
+def _pinned_cache_key(user) -> str:
+    return f"db-router:pinned:{user.pk}"
+
+
+def pin_to_primary(user) -> None:
+    """Read the user's data from the primary until replicas catch up with a write"""
+    if settings.DATABASE_REPLICAS:
+        cache.set(
+            _pinned_cache_key(user),
+            True,
+            timeout=settings.DATABASE_REPLICA_STICKY_SECONDS,
+        )
+
+
+def is_pinned_to_primary(user) -> bool:
+    """Return whether the user recently wrote and must read from the primary"""
+    if not settings.DATABASE_REPLICAS:
+        return False
+    return cache.get(_pinned_cache_key(user)) is not None
+
+
+def pins_are_shared() -> bool:
+    """Return whether every process sees the pins, i.e. the cache is shared
+
+    With a process-local cache a write only pins the process that served it,
+    and the user's next request could read a lagging replica elsewhere.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+@contextlib.contextmanager
+def replica_reads(user=None) -> t.Iterator[None]:
+    """Route the reads made within the block to one of the replicas
+
+    The same replica serves every read in the block so results are consistent
+    with each other. Reads stay on the primary when there are no replicas,
+    the pins aren't shared between processes, or the user has written within
+    the sticky window.
+    """
+    replicas_usable = settings.DATABASE_REPLICAS and pins_are_shared()
+    if not replicas_usable or (user is not None and is_pinned_to_primary(user)):
+        yield
+        return
+
+    token = _replica_alias.set(random.choice(settings.DATABASE_REPLICAS))
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Routes reads made inside `replica_reads` to a replica"""
+
+    def db_for_read(self, model, **hints):
+        return _replica_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db != "default" and db in settings.DATABASE_REPLICAS:
+            return False
+        return None
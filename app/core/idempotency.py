@@ -0,0 +1,71 @@
+"""
+Idempotent create requests for the API views
+
+A client retrying a create request sends the same `Idempotency-Key` header and
+gets the response of the first request back instead of creating a duplicate.
+"""
+import hashlib
+import json
+
+from core.models import IdempotencyKey
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+def request_fingerprint(request) -> str:
+    """Return a hash identifying the request's path and body"""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.path}\n{body}".encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """Replay the stored response of creates made with an Idempotency-Key
+
+    Replays skip validation and perform_create entirely. The key is claimed in
+    the same transaction as the create, so a failed create releases it, and a
+    concurrent duplicate waits for the first request and replays its response.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None or not request.user.is_authenticated:
+            return super().create(request, *args, **kwargs)  # type: ignore
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_KEY_HEADER: [
+                        f"Must be between 1 and {MAX_KEY_LENGTH} characters"
+                    ]
+                }
+            )
+
+        fingerprint = request_fingerprint(request)
+        with transaction.atomic():
+            idempotency_key, claimed = IdempotencyKey.objects.claim(
+                request.user, key, fingerprint
+            )
+            if not claimed:
+                if idempotency_key.request_fingerprint != fingerprint:
+                    return Response(
+                        {
+                            "detail": f"{IDEMPOTENCY_KEY_HEADER} was already used "
+                            "for a different request"
+                        },
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                return Response(
+                    idempotency_key.response_body,
+                    status=idempotency_key.response_status,
+                    headers={"Idempotent-Replayed": "true"},
+                )
+
+            response = super().create(request, *args, **kwargs)  # type: ignore
+            idempotency_key.response_status = response.status_code
+            idempotency_key.response_body = response.data
+            idempotency_key.save(update_fields=["response_status", "response_body"])
+        return response
@@ -0,0 +1,161 @@
+"""
+Postgres backed background jobs
+
+Apps register tasks in a `tasks` module, which the `run_jobs` management
+command discovers. `some_task.enqueue(**kwargs)` queues a job and a worker
+calls the task with those kwargs, outside of the request that queued it.
+"""
+import logging
+import random
+import traceback
+import typing as t
+from dataclasses import dataclass
+from datetime import timedelta
+
+from core.models import Job
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry of a failed job, doubled after each attempt
+RETRY_BASE_DELAY = 10
+RETRY_MAX_DELAY = 3600
+# Seconds into a batch after which each job's lease is renewed as it starts
+LEASE_RENEW_AFTER = 1
+
+
+@dataclass
+class Task:
+    """A function run by the workers, with the defaults of its jobs"""
+
+    name: str
+    func: t.Callable[..., t.Any]
+    lane: str = "default"
+    priority: int = 0
+    max_attempts: int = 5
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, run_at=None, priority: int | None = None, **kwargs) -> Job:
+        """Queue a job calling the task with kwargs, which must be JSON serializable
+
+        Call it inside the transaction writing the data the task needs, so the
+        job is only visible to the workers once that data is committed.
+        """
+        return Job.objects.enqueue(
+            self.name,
+            kwargs,
+            lane=self.lane,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=run_at,
+        )
+
+
+TASKS: dict[str, Task] = {}
+
+
+def task(name: str, lane: str = "default", priority: int = 0, max_attempts: int = 5):
+    """Register a function as the task name
+
+    Jobs are queued in lane, and workers claim higher priority jobs first.
+    """
+
+    def decorator(func: t.Callable[..., t.Any]) -> Task:
+        TASKS[name] = Task(
+            name=name,
+            func=func,
+            lane=lane,
+            priority=priority,
+            max_attempts=max_attempts,
+        )
+        return TASKS[name]
+
+    return decorator
+
+
+def retry_delay(attempts: int) -> float:
+    """Return the seconds to wait before retrying a job that failed attempts times
+
+    The jitter spreads out the retries of jobs that failed together.
+    """
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class Worker:
+    """Claim and run the jobs of some lanes"""
+
+    def __init__(
+        self,
+        lanes: t.Sequence[str] = ("default",),
+        lease_seconds: float = 300,
+        batch_size: int = 10,
+    ):
+        self.lanes = list(lanes)
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+
+    def run_batch(self) -> int:
+        """Run the next batch of due jobs and return how many were claimed
+
+        The batch is claimed in one query. Once it has run for longer than
+        LEASE_RENEW_AFTER, each job's lease is renewed as it starts, so a slow
+        job doesn't use up the lease of the jobs behind it, and a job whose
+        lease expired anyway is left to the worker that claimed it again.
+        Succeeded jobs are deleted together, before any lease is renewed and
+        at the end of the batch, so only the jobs of a worker that died run
+        again.
+        """
+        jobs = Job.objects.claim(self.lanes, self.lease_seconds, self.batch_size)
+        succeeded: list[int] = []
+        for job in jobs:
+            lease_left = job.run_at - timezone.now()
+            if lease_left < timedelta(seconds=self.lease_seconds - LEASE_RENEW_AFTER):
+                self._delete(succeeded)
+                if not Job.objects.renew_lease(job, self.lease_seconds):
+                    logger.warning("Job %s (%s) lease was lost", job.pk, job.task)
+                    continue
+            if self.run_job(job):
+                succeeded.append(job.pk)
+        self._delete(succeeded)
+        return len(jobs)
+
+    def _delete(self, succeeded: list[int]) -> None:
+        """Delete the succeeded jobs and clear the list"""
+        if succeeded:
+            Job.objects.filter(pk__in=succeeded).delete()
+            succeeded.clear()
+
+    def run_job(self, job: Job) -> bool:
+        """Run the job's task, scheduling its retry on failure, return if it succeeded"""
+        registered = TASKS.get(job.task)
+        try:
+            if registered is None:
+                raise LookupError(f"No task is registered as {job.task}")
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Lease expired during the last attempt")
+            registered(**job.payload)
+        except Exception:
+            self._fail(job, traceback.format_exc())
+            return False
+        return True
+
+    def _fail(self, job: Job, error: str) -> None:
+        """Record the error, queueing a retry unless the job is out of attempts"""
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed, giving up", job.pk, job.task)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.FAILED, last_error=error
+            )
+            return
+
+        logger.warning(
+            "Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts
+        )
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.QUEUED,
+            run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+            last_error=error,
+        )
@@ -0,0 +1,146 @@
+"""
+Django command to run the performance benchmarks and compare them to a baseline
+"""
+import json
+from pathlib import Path
+
+from core import benchmarking
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.test.utils import teardown_test_environment
+from django.utils.module_loading import autodiscover_modules
+
+
+class Command(BaseCommand):
+    """Django command to run benchmarks"""
+
+    help = "Run the benchmarks registered in each app's benchmarks module"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--filter",
+            default="",
+            help="Only run benchmarks whose name contains this text",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timed runs per benchmark",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=settings.BASE_DIR / "benchmark_baseline.json",
+            help=(
+                "Baseline file to compare against or save to, holding the "
+                "baselines of each machine they were measured on"
+            ),
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store the results as the new baseline",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=1.25,
+            help="Slowdown ratio against the baseline reported as a regression",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        autodiscover_modules("benchmarks")
+        benchmarks = [
+            bench
+            for name, bench in sorted(benchmarking.BENCHMARKS.items())
+            if options["filter"] in name
+        ]
+        if not benchmarks:
+            raise CommandError("No benchmarks matched")
+
+        results = self._run(benchmarks, options["repeat"])
+
+        baseline_path: Path = options["baseline"]
+        machine = benchmarking.machine_id()
+        baselines = {}
+        if baseline_path.exists():
+            baselines = json.loads(baseline_path.read_text())
+        if options["save_baseline"]:
+            baselines[machine] = {
+                **baselines.get(machine, {}),
+                **{result.name: result.median for result in results},
+            }
+            baseline_path.write_text(
+                json.dumps(baselines, indent=2, sort_keys=True) + "\n"
+            )
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {baseline_path}"))
+            return
+
+        # Timings only compare on the hardware they were measured on
+        baseline = baselines.get(machine, {})
+        if not baseline:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No baseline saved for this machine ({machine}), run with "
+                    "--save-baseline to store one"
+                )
+            )
+        comparisons = benchmarking.compare(results, baseline, options["threshold"])
+        self._report(comparisons)
+
+        regressions = [comparison for comparison in comparisons if comparison.regressed]
+        if regressions:
+            names = ", ".join(comparison.name for comparison in regressions)
+            raise CommandError(
+                f"{len(regressions)} benchmark(s) slower than the baseline: {names}"
+            )
+
+    def _run(self, benchmarks, repeat):
+        """Run the benchmarks, against a test database if any need one"""
+        needs_database = any(bench.database for bench in benchmarks)
+        if needs_database:
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            results = []
+            for bench in benchmarks:
+                self.stdout.write(f"Running {bench.name}...")
+                results.append(benchmarking.run_benchmark(bench, repeat))
+            return results
+        finally:
+            if needs_database:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+    def _report(self, comparisons):
+        """Write the comparison table, timings are the median per call"""
+        self.stdout.write(
+            f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>8}"
+        )
+        for comparison in comparisons:
+            baseline = (
+                _format_duration(comparison.baseline) if comparison.baseline else "-"
+            )
+            change = (
+                f"{(comparison.ratio - 1) * 100:+.1f}%"
+                if comparison.ratio is not None
+                else "new"
+            )
+            line = (
+                f"{comparison.name:<45} {baseline:>12} "
+                f"{_format_duration(comparison.current):>12} {change:>8}"
+            )
+            if comparison.regressed:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
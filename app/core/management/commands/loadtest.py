@@ -0,0 +1,242 @@
+"""
+Django command to drive quote traffic against a running server and report latency
+"""
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+DEFAULT_MIX = "create=1,list=4,retrieve=4,update=1"
+
+STATES = ["CA", "TX", "NY"]
+TYPE_COVERAGES = ["Basic", "Premium"]
+
+
+@dataclass
+class _Client:
+    """Load test user with their token and the quotes they created"""
+
+    token: str
+    quote_ids: list[int] = field(default_factory=list)
+
+
+@dataclass
+class _EndpointStats:
+    """Latencies and errors recorded for an endpoint"""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of an ordered list"""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _parse_mix(mix: str) -> dict[str, int]:
+    """Parse `action=weight,...` into weights for each action"""
+    weights = {}
+    for item in mix.split(","):
+        action, _, weight = item.partition("=")
+        if action not in {"create", "list", "retrieve", "update"}:
+            raise CommandError(f"Unknown action in mix: {action}")
+        weights[action] = int(weight or 1)
+    return weights
+
+
+class Command(BaseCommand):
+    """Django command to load test the Quote API"""
+
+    help = (
+        "Create users and tokens, then send a mix of quote requests to a running "
+        "server at a target rate and report throughput and latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000",
+            help="Base URL of the server under test",
+        )
+        parser.add_argument("--users", type=int, default=10, help="Users to create")
+        parser.add_argument(
+            "--rps", type=float, default=50, help="Target requests per second"
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds to send traffic for"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Maximum number of requests in flight",
+        )
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help="Relative weights of the quote actions to send",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed so runs send the same sequence of requests",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        self.base_url = options["url"].rstrip("/")
+        self.random = random.Random(options["seed"])
+        self.lock = threading.Lock()
+        self.stats: dict[str, _EndpointStats] = {}
+        weights = _parse_mix(options["mix"])
+
+        self.stdout.write(f"Creating {options['users']} users...")
+        clients = [self._create_client() for _ in range(options["users"])]
+
+        self.stdout.write(
+            f"Sending {options['rps']:g} requests/second for {options['duration']:g}s..."
+        )
+        interval = 1 / options["rps"]
+        total_requests = int(options["rps"] * options["duration"])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            for i in range(total_requests):
+                # Requests are scheduled on a fixed timetable, latency is
+                # measured from the scheduled time so a slow server can't hide
+                # its queueing delay by slowing down the sender
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                action = self.random.choices(list(weights), list(weights.values()))[0]
+                client = self.random.choice(clients)
+                executor.submit(self._send, action, client, scheduled, i)
+        elapsed = time.perf_counter() - start
+
+        self._report(elapsed)
+
+    def _request(self, method: str, path: str, token: str | None = None, payload=None):
+        """Send a JSON request and return the decoded response body"""
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=json.dumps(payload).encode() if payload is not None else None,
+            headers=headers,
+            method=method,
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = response.read()
+        return json.loads(body) if body else None
+
+    def _create_client(self) -> _Client:
+        """Create a user through the API and return a client with their token"""
+        credentials = {
+            "email": f"loadtest-{uuid.uuid4().hex}@example.com",
+            "password": "loadTestPassword123",
+        }
+        try:
+            self._request(
+                "POST",
+                "/api/user/create/",
+                payload={**credentials, "name": "Load Test"},
+            )
+            token = self._request("POST", "/api/user/token/", payload=credentials)[
+                "token"
+            ]
+        except (urllib.error.URLError, OSError) as error:
+            raise CommandError(f"Unable to create a user at {self.base_url}: {error}")
+
+        client = _Client(token=token)
+        quote = self._request(
+            "POST", "/api/quote/quotes/", token, self._quote_payload(self.random)
+        )
+        client.quote_ids.append(quote["id"])
+        return client
+
+    def _quote_payload(self, rng: random.Random) -> dict:
+        return {
+            "buyer_first_name": "Load",
+            "buyer_last_name": "Test",
+            "state": rng.choice(STATES),
+            "flat_cost_coverages": {
+                "type_coverage": rng.choice(TYPE_COVERAGES),
+                "pet_coverage": rng.random() < 0.5,
+            },
+            "percentage_cost_coverages": {"flood_coverage": rng.random() < 0.5},
+        }
+
+    def _send(self, action: str, client: _Client, scheduled: float, seq: int):
+        """Send one request for the action and record its latency"""
+        rng = random.Random(seq)
+        with self.lock:
+            quote_id = rng.choice(client.quote_ids)
+        try:
+            if action == "create":
+                quote = self._request(
+                    "POST", "/api/quote/quotes/", client.token, self._quote_payload(rng)
+                )
+                with self.lock:
+                    client.quote_ids.append(quote["id"])
+            elif action == "list":
+                self._request("GET", "/api/quote/quotes/", client.token)
+            elif action == "retrieve":
+                self._request("GET", f"/api/quote/quotes/{quote_id}/", client.token)
+            elif action == "update":
+                self._request(
+                    "PATCH",
+                    f"/api/quote/quotes/{quote_id}/",
+                    client.token,
+                    {"buyer_first_name": f"Load{seq}"},
+                )
+            failed = False
+        except (urllib.error.URLError, OSError):
+            failed = True
+        latency = time.perf_counter() - scheduled
+
+        with self.lock:
+            stats = self.stats.setdefault(action, _EndpointStats())
+            stats.latencies.append(latency)
+            stats.errors += failed
+
+    def _report(self, elapsed: float):
+        """Write throughput and latency percentiles per action"""
+        self.stdout.write(
+            f"\n{'action':<10} {'requests':>9} {'errors':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        all_latencies: list[float] = []
+        all_errors = 0
+        for action, stats in sorted(self.stats.items()):
+            all_latencies += stats.latencies
+            all_errors += stats.errors
+            self._report_line(action, stats.latencies, stats.errors, elapsed)
+        self._report_line("total", all_latencies, all_errors, elapsed)
+
+    def _report_line(
+        self, name: str, latencies: list[float], errors: int, elapsed: float
+    ):
+        ordered = sorted(latencies)
+        percentiles = [_percentile(ordered, p) * 1000 for p in (50, 95, 99, 100)]
+        columns = [
+            f"{name:<10}",
+            f"{len(ordered):>9}",
+            f"{errors:>7}",
+            f"{len(ordered) / elapsed:>8.1f}",
+            *(f"{value:>8.1f}" for value in percentiles),
+        ]
+        self.stdout.write(" ".join(columns))
@@ -0,0 +1,120 @@
+"""
+Django command to profile how long a worker takes to start and what it imports
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+# Started in a fresh interpreter so nothing is imported yet, mirrors what a
+# gunicorn worker does before serving its first request
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+wsgi = time.perf_counter()
+print(json.dumps({
+    "django.setup()": setup - start,
+    "urlconf": urls - setup,
+    "wsgi application": wsgi - urls,
+}))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+@dataclass
+class ImportTime:
+    """Microseconds spent importing a module, alone and with its imports"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """Parse the `-X importtime` report written to stderr"""
+    times = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            times.append(
+                ImportTime(
+                    module=module,
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    depth=(len(indent) - 1) // 2,
+                )
+            )
+    return times
+
+
+class Command(BaseCommand):
+    """Django command to profile startup"""
+
+    help = (
+        "Start the app in a fresh interpreter and report the time spent in each "
+        "startup phase and the slowest imports"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=25, help="Number of imports to show"
+        )
+        parser.add_argument(
+            "--by",
+            choices=["package", "module"],
+            default="package",
+            help="Report import time per top-level package or per module",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"App failed to start:\n{result.stderr[-2000:]}")
+
+        phases = json.loads(result.stdout.splitlines()[-1])
+        self.stdout.write(f"{'phase':<20} {'ms':>8}")
+        for phase, seconds in phases.items():
+            self.stdout.write(f"{phase:<20} {seconds * 1000:>8.1f}")
+        self.stdout.write(f"{'total':<20} {sum(phases.values()) * 1000:>8.1f}")
+
+        times = parse_import_times(result.stderr)
+        if options["by"] == "package":
+            totals: dict[str, int] = {}
+            for item in times:
+                package = item.module.partition(".")[0]
+                totals[package] = totals.get(package, 0) + item.self_us
+        else:
+            totals = {item.module: item.cumulative_us for item in times}
+
+        label = (
+            "package (self)" if options["by"] == "package" else "module (cumulative)"
+        )
+        self.stdout.write(f"\n{label:<50} {'ms':>8}")
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        for name, microseconds in ranked[: options["limit"]]:
+            self.stdout.write(f"{name:<50} {microseconds / 1000:>8.1f}")
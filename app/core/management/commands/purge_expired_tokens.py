@@ -0,0 +1,33 @@
+"""
+Django command to delete the auth tokens that went unused past their TTL
+"""
+from core.models import TokenUsage
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to purge expired auth tokens"""
+
+    help = "Delete the auth tokens unused for longer than AUTH_TOKEN_TTL_HOURS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of tokens to delete per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to wait between batches",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        deleted = TokenUsage.objects.purge(
+            batch_size=options["batch_size"], pause=options["pause"]
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens!"))
@@ -0,0 +1,32 @@
+"""
+Django command to delete the idempotency keys that are past their TTL
+"""
+from datetime import timedelta
+
+from core.models import IdempotencyKey
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """Django command to purge expired idempotency keys"""
+
+    help = "Delete the idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of keys to delete per query",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        deleted = IdempotencyKey.objects.purge(cutoff, batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys!")
+        )
@@ -0,0 +1,26 @@
+"""
+Django command to rebuild the per-user quote summaries from the quotes table
+"""
+from core.models import QuoteSummary
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to rebuild quote summaries"""
+
+    help = "Recompute every user's quote count and monthly total from their quotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of summaries to insert per query",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        self.stdout.write("Rebuilding quote summaries...")
+        created = QuoteSummary.objects.rebuild(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} quote summaries!"))
@@ -0,0 +1,86 @@
+"""
+Django command to run the queued background jobs
+"""
+import signal
+import time
+
+from core import jobs
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+
+class Command(BaseCommand):
+    """Django command to run jobs"""
+
+    help = (
+        "Run the jobs queued for the tasks registered in each app's tasks "
+        "module. Start as many workers as needed, they never claim the same job"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lanes",
+            default="default",
+            help="Comma separated lanes to run the jobs of",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="Number of jobs claimed per query",
+        )
+        parser.add_argument(
+            "--lease",
+            type=float,
+            default=300,
+            help=(
+                "Seconds a claimed job is reserved for, after which another "
+                "worker may run it again. Must exceed the longest task"
+            ),
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1,
+            help="Seconds to wait before polling an empty queue again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        autodiscover_modules("tasks")
+        lanes = [lane.strip() for lane in options["lanes"].split(",") if lane.strip()]
+        worker = jobs.Worker(
+            lanes=lanes,
+            lease_seconds=options["lease"],
+            batch_size=options["batch_size"],
+        )
+        self.stopping = False
+        previous_handler = signal.signal(signal.SIGTERM, self._stop)
+
+        self.stdout.write(f"Running jobs of lanes: {', '.join(lanes)}")
+        processed = 0
+        try:
+            while not self.stopping:
+                claimed = worker.run_batch()
+                processed += claimed
+                if claimed:
+                    continue
+                if options["burst"]:
+                    break
+                # Drop the connection while idle, it reconnects on the next poll
+                close_old_connections()
+                time.sleep(options["poll_interval"])
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs!"))
+
+    def _stop(self, signum, frame):
+        """Stop after the current batch of jobs"""
+        self.stopping = True
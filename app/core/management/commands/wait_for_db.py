@@ -1,26 +1,71 @@
 """
 Django comand to wait for the database to be available
 """
+import random
 import time
 
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db import DEFAULT_DB_ALIAS
 from django.db.utils import OperationalError
 from psycopg2 import OperationalError as Psycopg2OpError
 
+# Seconds before the first retry, doubled after each failed attempt
+INITIAL_DELAY = 0.1
+
 
 class Command(BaseCommand):
     """Django command to wait for database"""
 
+    help = (
+        "Wait for the database to accept connections, retrying with "
+        "exponential backoff and jitter"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to wait for",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait before giving up",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=5,
+            help="Longest wait between two attempts, in seconds",
+        )
+
     def handle(self, *args, **options):
         """Entrypoint for command"""
         self.stdout.write("Waiting for database...")
-        db_up = False
-        while db_up is False:
+        connection = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        attempt = 0
+        while True:
             try:
-                self.check(databases=["default"])
-                db_up = True
+                connection.ensure_connection()
+                break
             except (Psycopg2OpError, OperationalError):
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f"Database unavailable after {options['timeout']:g} seconds"
+                    )
+                # Full jitter keeps containers started together from retrying
+                # in lockstep
+                ceiling = min(options["max_delay"], INITIAL_DELAY * 2**attempt)
+                delay = min(random.uniform(0, ceiling), remaining)
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.2f} seconds..."
+                )
+                time.sleep(delay)
+                attempt += 1
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
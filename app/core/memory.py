@@ -0,0 +1,138 @@
+"""
+On-demand memory profiling of the running process
+
+Tracing starts with the first snapshot and stops when profiling is stopped, so
+workers only pay for tracemalloc while someone is looking. State is kept per
+process, like the request metrics.
+"""
+import collections
+import gc
+import os
+import threading
+import tracemalloc
+import typing as t
+
+from django.conf import settings
+from django.db import models as m
+
+# Frames of the profiler itself and of imports are left out of the reports
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    """Return the allocation site of a traceback, relative to the app"""
+    return " < ".join(
+        f"{os.path.relpath(frame.filename, settings.BASE_DIR)}:{frame.lineno}"
+        if frame.filename.startswith(str(settings.BASE_DIR))
+        else f"{frame.filename}:{frame.lineno}"
+        for frame in traceback
+    )
+
+
+def rss_bytes() -> int | None:
+    """Return the resident set size of the process, where /proc is available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def count_model_instances() -> dict[str, int]:
+    """Return the number of model instances alive, by model label"""
+    counts: collections.Counter[str] = collections.Counter()
+    for obj in gc.get_objects():
+        # type() rather than isinstance(), which would evaluate lazy objects
+        if issubclass(type(obj), m.Model):
+            counts[obj._meta.label] += 1
+    return dict(counts.most_common())
+
+
+class MemoryProfiler:
+    """Takes tracemalloc snapshots and reports how they grow"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._first: tuple[tracemalloc.Snapshot, dict[str, int]] | None = None
+        self._previous: tuple[tracemalloc.Snapshot, dict[str, int]] | None = None
+        self._snapshots = 0
+
+    def snapshot(
+        self, limit: int = 10, since_start: bool = False, frames: int = 1
+    ) -> dict[str, t.Any]:
+        """Take a snapshot and report the top allocation sites and growth
+
+        Tracing starts on the first snapshot, keeping `frames` frames per
+        allocation, so its growth is only reported from the next one. Growth is
+        measured since the previous snapshot, or the first with `since_start`.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                self._first = self._previous = None
+                self._snapshots = 0
+                tracemalloc.start(frames)
+
+            key_type = (
+                "traceback" if tracemalloc.get_traceback_limit() > 1 else "lineno"
+            )
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            objects = count_model_instances()
+            compared_to = self._first if since_start else self._previous
+
+            current, peak = tracemalloc.get_traced_memory()
+            report: dict[str, t.Any] = {
+                "pid": os.getpid(),
+                "rss_bytes": rss_bytes(),
+                "traced_bytes": current,
+                "peak_traced_bytes": peak,
+                "snapshot": self._snapshots,
+                "top_allocations": [
+                    {
+                        "site": _site(stat.traceback),
+                        "size": stat.size,
+                        "count": stat.count,
+                    }
+                    for stat in snapshot.statistics(key_type)[:limit]
+                ],
+                "objects": objects,
+                "growth": [],
+                "objects_growth": {},
+            }
+            if compared_to is not None:
+                report["growth"] = [
+                    {
+                        "site": _site(stat.traceback),
+                        "size": stat.size,
+                        "size_diff": stat.size_diff,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in snapshot.compare_to(compared_to[0], key_type)[:limit]
+                    if stat.size_diff
+                ]
+                report["objects_growth"] = {
+                    label: count - compared_to[1].get(label, 0)
+                    for label, count in objects.items()
+                    if count != compared_to[1].get(label, 0)
+                }
+
+            self._previous = (snapshot, objects)
+            if self._first is None:
+                self._first = self._previous
+            self._snapshots += 1
+            return report
+
+    def stop(self) -> None:
+        """Stop tracing and drop the snapshots"""
+        with self._lock:
+            tracemalloc.stop()
+            self._first = self._previous = None
+            self._snapshots = 0
+
+
+PROFILER = MemoryProfiler()
@@ -0,0 +1,213 @@
+"""
+Request performance metrics exposed in the Prometheus text format
+
+Metrics are kept in memory per process, so with multiple workers each worker
+reports its own values and Prometheus should scrape every worker.
+"""
+import bisect
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+import typing as t
+
+from rest_framework import serializers
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+F = t.TypeVar("F", bound=t.Callable[..., t.Any])
+
+# Time spent per phase (pricing, serializer, auth...) in the current request,
+# None when no request is being measured so `timed` costs next to nothing
+_request_timings: contextvars.ContextVar[
+    dict[str, float] | None
+] = contextvars.ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """Cumulative histogram of observed values"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Collection of labelled histograms and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, tuple[str, tuple[float, ...]]] = {}
+        self._histogram_values: dict[tuple[str, tuple], Histogram] = {}
+        self._counters: dict[str, str] = {}
+        self._counter_values: dict[tuple[str, tuple], float] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...]):
+        self._histograms[name] = (help_text, buckets)
+
+    def counter(self, name: str, help_text: str):
+        self._counters[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histogram_values.get(key)
+            if histogram is None:
+                histogram = Histogram(self._histograms[name][1])
+                self._histogram_values[key] = histogram
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counter_values[key] = self._counter_values.get(key, 0) + value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histogram_values.clear()
+            self._counter_values.clear()
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, help_text in self._counters.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (metric, labels), value in sorted(self._counter_values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+            for name, (help_text, buckets) in self._histograms.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (metric, labels), histogram in sorted(
+                    self._histogram_values.items(), key=lambda item: item[0]
+                ):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*buckets, "+Inf"), histogram.counts, strict=True
+                    ):
+                        cumulative += count
+                        le = bound if isinstance(bound, str) else f"{bound:g}"
+                        bucket_labels = _format_labels((*labels, ("le", le)))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {histogram.sum:g}"
+                    )
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.counter("http_requests_total", "Requests handled by endpoint and status")
+REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling requests",
+    LATENCY_BUCKETS,
+)
+REGISTRY.histogram(
+    "http_request_db_queries",
+    "Database queries made per request",
+    QUERY_COUNT_BUCKETS,
+)
+REGISTRY.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request",
+    LATENCY_BUCKETS,
+)
+REGISTRY.histogram(
+    "http_request_phase_duration_seconds",
+    "Time spent in each phase (auth, serializer, pricing) per request",
+    LATENCY_BUCKETS,
+)
+
+
+@contextlib.contextmanager
+def measure_request() -> t.Iterator[dict[str, float]]:
+    """Collect the phase timings for the request handled within the block"""
+    timings: dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> t.Iterator[None]:
+    """Add the time spent in the block to the phase of the current request
+
+    Decorate functions with `timed_function` instead, which doesn't build a
+    context manager per call when no request is measured.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def timed_function(phase: str) -> t.Callable[[F], F]:
+    """Decorate a function to add its time to the phase of the current request"""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _request_timings.get()
+            if timings is None:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+        return t.cast(F, wrapper)
+
+    return decorator
+
+
+class TimedSerializerMixin:
+    """Record the time a serializer spends validating and rendering"""
+
+    def is_valid(self, raise_exception=False):
+        with timed("serializer"):
+            return super().is_valid(raise_exception=raise_exception)  # type: ignore
+
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data  # type: ignore
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """List serializer recording the time spent rendering the whole list"""
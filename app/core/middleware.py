@@ -0,0 +1,216 @@
+"""
+Django middleware for the application
+"""
+import contextlib
+import re
+import time
+
+from core import metrics
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db import DatabaseError
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ACCEPT_ENCODING_ENTRY = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q=([\d.]+))?\s*$")
+
+
+class HealthCheckMiddleware:
+    """Answer the liveness and readiness probes ahead of the other middleware
+
+    Probes skip host validation, sessions, authentication and DRF. Readiness
+    pings the default database and reuses the result for
+    HEALTH_CHECK_DB_CACHE_SECONDS, so frequent probes don't each add a query.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.db_checked_at: float | None = None
+        self.db_ready = False
+
+    def __call__(self, request):
+        if request.path == settings.HEALTH_CHECK_LIVENESS_PATH:
+            return self._probe_response(True)
+        if request.path == settings.HEALTH_CHECK_READINESS_PATH:
+            return self._probe_response(self._database_ready())
+        return self.get_response(request)
+
+    def _database_ready(self) -> bool:
+        """Return whether the default database answered its last ping"""
+        now = time.monotonic()
+        if self.db_checked_at is not None:
+            age = now - self.db_checked_at
+            if age < settings.HEALTH_CHECK_DB_CACHE_SECONDS:
+                return self.db_ready
+
+        try:
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            self.db_ready = True
+        except DatabaseError:
+            self.db_ready = False
+        self.db_checked_at = now
+        return self.db_ready
+
+    def _probe_response(self, healthy: bool) -> HttpResponse:
+        """Return the plain text response to a probe"""
+        if healthy:
+            return HttpResponse("ok", content_type="text/plain")
+        return HttpResponse("unavailable", content_type="text/plain", status=503)
+
+
+class PerformanceMetricsMiddleware:
+    """Record per-endpoint latency, query counts and phase timings
+
+    Removed from the middleware chain at startup unless
+    PERFORMANCE_METRICS_ENABLED is set, so it costs nothing when disabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with metrics.measure_request() as timings, contextlib.ExitStack() as stack:
+            timings["db"] = 0.0
+            timings["db_queries"] = 0
+
+            def record_query(execute, sql, params, many, context):
+                query_start = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    timings["db"] += time.perf_counter() - query_start
+                    timings["db_queries"] += 1
+
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start
+        db_duration = timings.pop("db")
+        db_queries = int(timings.pop("db_queries"))
+        labels = {
+            "endpoint": self._endpoint(request),
+            "method": request.method,
+        }
+        metrics.REGISTRY.increment(
+            "http_requests_total", status=str(response.status_code), **labels
+        )
+        metrics.REGISTRY.observe("http_request_duration_seconds", duration, **labels)
+        metrics.REGISTRY.observe("http_request_db_queries", db_queries, **labels)
+        metrics.REGISTRY.observe(
+            "http_request_db_duration_seconds", db_duration, **labels
+        )
+        for phase, phase_duration in timings.items():
+            metrics.REGISTRY.observe(
+                "http_request_phase_duration_seconds",
+                phase_duration,
+                phase=phase,
+                **labels,
+            )
+
+        if settings.PERFORMANCE_SERVER_TIMING:
+            response["Server-Timing"] = self._server_timing(
+                duration, db_duration, db_queries, timings
+            )
+
+        return response
+
+    def _endpoint(self, request) -> str:
+        """Return a low cardinality name for the endpoint that was requested"""
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None:
+            return "unresolved"
+        return resolver_match.view_name
+
+    def _server_timing(
+        self,
+        duration: float,
+        db_duration: float,
+        db_queries: int,
+        timings: dict[str, float],
+    ) -> str:
+        """Return the Server-Timing header value with durations in milliseconds"""
+        entries = [f'db;desc="{db_queries} queries";dur={db_duration * 1000:.2f}']
+        entries += [
+            f"{phase};dur={value * 1000:.2f}" for phase, value in timings.items()
+        ]
+        entries.append(f"total;dur={duration * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as accepted by the client
+
+    Brotli is preferred when the optional brotli package is installed. Small,
+    streaming and already encoded responses are sent as they are.
+    """
+
+    min_length = 200
+    # Quality 5 compresses close to the maximum at a fraction of its CPU cost,
+    # higher levels are meant for static assets compressed ahead of time
+    brotli_quality = 5
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self._encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        else:
+            compressed = compress_string(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(response.content))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # The compressed body is a different representation, same as
+            # Django's GZipMiddleware
+            response["ETag"] = "W/" + etag
+        return response
+
+    def _encoding(self, accept_encoding: str) -> str | None:
+        """Return the best encoding the client accepts, br or gzip"""
+        accepted = {}
+        for entry in accept_encoding.split(","):
+            match = ACCEPT_ENCODING_ENTRY.match(entry)
+            if match:
+                coding, quality = match.groups()
+                try:
+                    accepted[coding.lower()] = float(quality or 1)
+                except ValueError:
+                    continue
+
+        supported = ["br", "gzip"] if brotli else ["gzip"]
+        candidates = [
+            (accepted.get(coding, accepted.get("*", 0)), -rank, coding)
+            for rank, coding in enumerate(supported)
+        ]
+        quality, _, coding = max(candidates)
+        return coding if quality > 0 else None
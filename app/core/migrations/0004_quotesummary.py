@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-19 00:57
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_auto_20230205_2045"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuoteSummary",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="quote_summary",
+                        serialize=False,
+                        to="core.user",
+                    ),
+                ),
+                ("quote_count", models.PositiveIntegerField(default=0)),
+                (
+                    "monthly_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-19 00:58
+import django.contrib.postgres.indexes
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_quotesummary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="quote",
+            index=models.Index(
+                fields=["user", "state"], name="core_quote_user_state_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quote",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["flat_cost_coverages"],
+                name="core_quote_flat_cov_gin_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quote",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["percentage_cost_coverages"],
+                name="core_quote_pct_cov_gin_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        # Serves the case-insensitive `istartswith` lookup on the buyer's last
+        # name, which compiles to `UPPER("buyer_last_name"::text) LIKE ...`
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX core_quote_last_name_prefix_idx ON core_quote "
+                '("user_id", UPPER("buyer_last_name") text_pattern_ops)'
+            ),
+            reverse_sql="DROP INDEX core_quote_last_name_prefix_idx",
+        ),
+    ]
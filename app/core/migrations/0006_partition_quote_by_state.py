@@ -0,0 +1,103 @@
+"""
+Converts core_quote into a table partitioned by state.
+
+Each state gets its own partition so state-scoped queries and repricing only
+scan that state's rows. States without a partition land in
+core_quote_default. The primary key becomes (id, state) because Postgres
+requires unique constraints on a partitioned table to include the partition
+key. Django still treats `id` as the primary key and the id sequence is
+unchanged. Tables referencing a quote must not declare a database-level
+foreign key to core_quote.
+
+The (user_id, state) index from migration 0005 is dropped: within a state's
+partition it orders rows no better than the user_id index does.
+"""
+from django.db import migrations
+
+STATE_PARTITIONS = ["CA", "TX", "NY"]
+
+# Indexes and constraints are recreated on the new table under the names
+# Django and migration 0005 gave them on the original table
+INDEXES_SQL = [
+    'CREATE INDEX core_quote_user_id_5b539744 ON core_quote ("user_id")',
+    (
+        "ALTER TABLE core_quote ADD CONSTRAINT "
+        'core_quote_user_id_5b539744_fk_core_user_id FOREIGN KEY ("user_id") '
+        'REFERENCES core_user ("id") DEFERRABLE INITIALLY DEFERRED'
+    ),
+    (
+        "CREATE INDEX core_quote_flat_cov_gin_idx ON core_quote "
+        'USING gin ("flat_cost_coverages" jsonb_path_ops)'
+    ),
+    (
+        "CREATE INDEX core_quote_pct_cov_gin_idx ON core_quote "
+        'USING gin ("percentage_cost_coverages" jsonb_path_ops)'
+    ),
+    (
+        "CREATE INDEX core_quote_last_name_prefix_idx ON core_quote "
+        '("user_id", UPPER("buyer_last_name") text_pattern_ops)'
+    ),
+]
+
+
+USER_STATE_INDEX_SQL = (
+    'CREATE INDEX core_quote_user_state_idx ON core_quote ("user_id", "state")'
+)
+
+
+def _swap_table_sql(
+    create_table_sql: list[str], primary_key: str, indexes_sql: list[str]
+) -> list[str]:
+    """Return the SQL to copy core_quote into a new table with the same name"""
+    return [
+        "ALTER TABLE core_quote RENAME TO core_quote_previous",
+        *create_table_sql,
+        "INSERT INTO core_quote SELECT * FROM core_quote_previous",
+        "ALTER SEQUENCE core_quote_id_seq OWNED BY core_quote.id",
+        "DROP TABLE core_quote_previous",
+        f"ALTER TABLE core_quote ADD CONSTRAINT core_quote_pkey PRIMARY KEY ({primary_key})",
+        *indexes_sql,
+    ]
+
+
+PARTITION_SQL = _swap_table_sql(
+    [
+        (
+            "CREATE TABLE core_quote (LIKE core_quote_previous INCLUDING DEFAULTS) "
+            'PARTITION BY LIST ("state")'
+        ),
+        *[
+            f"CREATE TABLE core_quote_{state.lower()} PARTITION OF core_quote "
+            f"FOR VALUES IN ('{state}')"
+            for state in STATE_PARTITIONS
+        ],
+        "CREATE TABLE core_quote_default PARTITION OF core_quote DEFAULT",
+    ],
+    primary_key='"id", "state"',
+    indexes_sql=INDEXES_SQL,
+)
+
+UNPARTITION_SQL = _swap_table_sql(
+    ["CREATE TABLE core_quote (LIKE core_quote_previous INCLUDING DEFAULTS)"],
+    primary_key='"id"',
+    indexes_sql=[*INDEXES_SQL, USER_STATE_INDEX_SQL],
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_quote_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=PARTITION_SQL,
+            reverse_sql=UNPARTITION_SQL,
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="quote", name="core_quote_user_state_idx"
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-19 02:09
+import django.contrib.postgres.indexes
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_quoteevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuotePriceHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("recorded_at", models.DateTimeField(auto_now_add=True)),
+                ("quote_id", models.BigIntegerField()),
+                ("monthly_subtotal_cents", models.IntegerField()),
+                ("monthly_taxes_cents", models.IntegerField()),
+                ("monthly_total_cents", models.IntegerField()),
+                ("rate_version", models.CharField(max_length=16)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="quotepricehistory",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                autosummarize=True,
+                fields=["recorded_at"],
+                name="core_quotepricehist_brin_idx",
+            ),
+        ),
+    ]
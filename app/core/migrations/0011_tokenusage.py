@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-19 02:12
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authtoken", "0003_tokenproxy"),
+        ("core", "0010_quotepricehistory"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TokenUsage",
+            fields=[
+                (
+                    "token",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="usage",
+                        serialize=False,
+                        to="authtoken.token",
+                    ),
+                ),
+                ("last_used_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+        # Existing tokens start their TTL now instead of expiring on deploy
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO core_tokenusage (token_id, last_used_at) "
+                "SELECT key, NOW() FROM authtoken_token"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
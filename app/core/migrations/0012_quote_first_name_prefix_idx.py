@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 02:59
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_tokenusage"),
+    ]
+
+    operations = [
+        # Serves the case-insensitive `istartswith` lookup on the buyer's first
+        # name like core_quote_last_name_prefix_idx does for the last name.
+        # Created on the partitioned table, so each partition gets its own
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX core_quote_first_name_prefix_idx ON core_quote "
+                '("user_id", UPPER("buyer_first_name") text_pattern_ops)'
+            ),
+            reverse_sql="DROP INDEX core_quote_first_name_prefix_idx",
+        ),
+    ]
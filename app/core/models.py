@@ -1,16 +1,29 @@
 """
 Database models
 """
+import time
+import typing as t
+from datetime import timedelta
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.indexes import BrinIndex
+from django.contrib.postgres.indexes import GinIndex
+from django.db import connections
+from django.db import IntegrityError
 from django.db import models as m
+from django.db import transaction
+from django.utils import timezone
 from quote.constants import DataClassField
 from quote.constants import QuoteFlatCostCoverages
 from quote.constants import QuotePercentageCostCoverages
 from quote.constants import States
 from quote.utils import EnhancedJSONEncoder
+from quote.utils import to_cents
+from rest_framework.authtoken.models import Token
 
 
 class UserManager(BaseUserManager):
@@ -53,6 +66,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class QuoteQuerySet(m.QuerySet):
+    """QuerySet for quotes"""
+
+    def in_states(self, *states: str) -> "QuoteQuerySet":
+        """Restrict the quotes to states so only their partitions are scanned"""
+        return self.filter(state__in=states)
+
+
 class Quote(m.Model):
     """Quote object"""
 
@@ -72,3 +93,468 @@ class Quote(m.Model):
     monthly_subtotal = m.DecimalField(max_digits=6, decimal_places=2, default=0)
     monthly_taxes = m.DecimalField(max_digits=6, decimal_places=2, default=0)
     monthly_total = m.DecimalField(max_digits=7, decimal_places=2, default=0)
+
+    # core_quote is partitioned by state (see migration 0006), so filter by
+    # state wherever it's known to let Postgres prune the other partitions
+    objects = QuoteQuerySet.as_manager()
+
+    class Meta:
+        # Backs the filters on the Quote API list endpoint. The buyer name
+        # prefix indexes need an operator class on an expression, which Django
+        # can't declare here, so they're created in migrations 0005 and 0012
+        indexes = [
+            GinIndex(
+                fields=["flat_cost_coverages"],
+                opclasses=["jsonb_path_ops"],
+                name="core_quote_flat_cov_gin_idx",
+            ),
+            GinIndex(
+                fields=["percentage_cost_coverages"],
+                opclasses=["jsonb_path_ops"],
+                name="core_quote_pct_cov_gin_idx",
+            ),
+        ]
+
+
+class QuoteSummaryManager(m.Manager):
+    """Manager for quote summaries"""
+
+    def apply_delta(
+        self,
+        user: User,
+        quote_count: int = 0,
+        monthly_total: Decimal = Decimal(0),
+    ) -> None:
+        """Add the deltas to the user's summary, creating the summary if needed"""
+        deltas = {
+            "quote_count": m.F("quote_count") + quote_count,
+            "monthly_total": m.F("monthly_total") + monthly_total,
+        }
+        with transaction.atomic(using=self.db):
+            if self.filter(user=user).update(**deltas):
+                return
+            if quote_count < 0:
+                # The summary is missing because the quotes were written
+                # outside of the API, rebuild_quote_summaries restores it
+                return
+            try:
+                # Savepoint so a concurrent insert for the same user only
+                # rolls back this attempt rather than the caller's transaction
+                with transaction.atomic(using=self.db):
+                    self.create(
+                        user=user,
+                        quote_count=quote_count,
+                        monthly_total=monthly_total,
+                    )
+            except IntegrityError:
+                self.filter(user=user).update(**deltas)
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Recompute every summary from the quotes table and return the count"""
+        with transaction.atomic(using=self.db):
+            # Block concurrent deltas until the rebuilt rows are committed so
+            # quotes written during the rebuild are applied on top of them
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {self.model._meta.db_table} IN EXCLUSIVE MODE"
+                )
+            self.all().delete()
+
+            totals = (
+                Quote.objects.using(self.db)
+                .order_by()
+                .values("user_id")
+                .annotate(
+                    quote_count=m.Count("id"),
+                    monthly_total=m.Sum("monthly_total"),
+                )
+            )
+            created = 0
+            batch: list[t.Any] = []
+            for row in totals.iterator(chunk_size=batch_size):
+                batch.append(self.model(**row))
+                if len(batch) >= batch_size:
+                    created += len(self.bulk_create(batch))
+                    batch = []
+            if batch:
+                created += len(self.bulk_create(batch))
+
+        return created
+
+
+class QuoteSummary(m.Model):
+    """Running quote count and monthly premium for a user"""
+
+    user = m.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=m.CASCADE,
+        primary_key=True,
+        related_name="quote_summary",
+    )
+    quote_count = m.PositiveIntegerField(default=0)
+    monthly_total = m.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Summaries are maintained by the Quote API, see QuoteViewSet
+    objects = QuoteSummaryManager()
+
+
+class QuotePriceHistoryManager(m.Manager):
+    """Manager for quote price history"""
+
+    def record(
+        self, quotes: t.Iterable[Quote], rate_version: str
+    ) -> list["QuotePriceHistory"]:
+        """Append the current prices of the quotes, priced at rate_version"""
+        return self.bulk_create(
+            self.model(
+                quote_id=quote.id,
+                rate_version=rate_version,
+                monthly_subtotal_cents=to_cents(quote.monthly_subtotal),
+                monthly_taxes_cents=to_cents(quote.monthly_taxes),
+                monthly_total_cents=to_cents(quote.monthly_total),
+            )
+            for quote in quotes
+        )
+
+
+class QuotePriceHistory(m.Model):
+    """Price of a quote from the time it was recorded, append only
+
+    Each row is a price the quote was given on creation, update or repricing.
+    Rows are kept narrow: amounts are integer cents, and the only index is a
+    BRIN index on recorded_at, which stays a few pages in size because rows
+    are appended in time order. Look a quote's history up within a time range.
+    """
+
+    recorded_at = m.DateTimeField(auto_now_add=True)
+    # Not a foreign key, core_quote is partitioned and the history of deleted
+    # quotes is kept
+    quote_id = m.BigIntegerField()
+    monthly_subtotal_cents = m.IntegerField()
+    monthly_taxes_cents = m.IntegerField()
+    monthly_total_cents = m.IntegerField()
+    # quote.constants.RATE_VERSION the quote was priced at
+    rate_version = m.CharField(max_length=16)
+
+    objects = QuotePriceHistoryManager()
+
+    class Meta:
+        indexes = [
+            # Autovacuum summarizes each block range as it fills, otherwise
+            # ranges appended after the last vacuum are always scanned
+            BrinIndex(
+                fields=["recorded_at"],
+                name="core_quotepricehist_brin_idx",
+                autosummarize=True,
+            )
+        ]
+
+
+# Namespace of the advisory locks serializing appends to each user's event feed
+QUOTE_EVENT_LOCK_NAMESPACE = 4601
+
+
+class QuoteEventManager(m.Manager):
+    """Manager for quote events"""
+
+    def append(self, user_id: int, *events: "QuoteEvent") -> list["QuoteEvent"]:
+        """Append unsaved events to the user's feed
+
+        Must run in the transaction that changed the quotes. Appends to the
+        same feed are serialized until commit with an advisory lock, so event
+        ids become visible in increasing order and a consumer reading past an
+        id never misses an event committed later with a lower id.
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                # The lock key is an int4, wrapped ids only share a lock
+                [QUOTE_EVENT_LOCK_NAMESPACE, user_id % 2**31],
+            )
+        for event in events:
+            event.user_id = user_id
+        return self.bulk_create(events)
+
+
+class QuoteEvent(m.Model):
+    """Change to a quote, read by downstream systems through the change feed"""
+
+    class EventType(m.TextChoices):
+        CREATED = "created"
+        UPDATED = "updated"
+        DELETED = "deleted"
+
+    user = m.ForeignKey(settings.AUTH_USER_MODEL, on_delete=m.CASCADE, db_index=False)
+    # Not a foreign key, core_quote is partitioned and deleted quotes keep
+    # their events
+    quote_id = m.BigIntegerField()
+    event_type = m.CharField(max_length=7, choices=EventType.choices)
+    # The quote as rendered by the API, only the id for deleted quotes
+    payload = m.JSONField()
+    created_at = m.DateTimeField(auto_now_add=True)
+
+    # Events are appended by the Quote API, see QuoteViewSet
+    objects = QuoteEventManager()
+
+    class Meta:
+        indexes = [
+            # Backs the change feed's range scan over a user's events
+            m.Index(fields=["user", "id"], name="core_quoteevent_user_id_idx")
+        ]
+
+
+class IdempotencyKeyManager(m.Manager):
+    """Manager for idempotency keys"""
+
+    def claim(self, user, key: str, fingerprint: str) -> tuple["IdempotencyKey", bool]:
+        """Claim the key for a request, or return the request that claimed it
+
+        Must run inside the transaction that handles the request. A concurrent
+        request with the same key blocks on the unique index until that
+        transaction ends, then gets the stored response, or claims the key
+        itself if the transaction rolled back.
+        """
+        try:
+            with transaction.atomic():
+                return (
+                    self.create(user=user, key=key, request_fingerprint=fingerprint),
+                    True,
+                )
+        except IntegrityError:
+            return self.get(user=user, key=key), False
+
+    def purge(self, older_than, batch_size: int = 1000) -> int:
+        """Delete keys created before older_than in batches, return the count"""
+        deleted = 0
+        while True:
+            pks = list(
+                self.filter(created_at__lt=older_than).values_list("pk", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not pks:
+                return deleted
+            deleted += self.filter(pk__in=pks).delete()[0]
+
+
+class IdempotencyKey(m.Model):
+    """Response stored for a request made with an Idempotency-Key header"""
+
+    user = m.ForeignKey(settings.AUTH_USER_MODEL, on_delete=m.CASCADE)
+    key = m.CharField(max_length=255)
+    # Hash of the request body, a key reused for a different request is rejected
+    request_fingerprint = m.CharField(max_length=64)
+    response_status = m.PositiveSmallIntegerField(null=True)
+    response_body = m.JSONField(null=True)
+    created_at = m.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = IdempotencyKeyManager()
+
+    class Meta:
+        constraints = [
+            m.UniqueConstraint(
+                fields=["user", "key"], name="core_idempotencykey_user_key_uniq"
+            )
+        ]
+
+
+class JobManager(m.Manager):
+    """Manager for background jobs"""
+
+    def enqueue(
+        self,
+        task: str,
+        payload: dict[str, t.Any] | None = None,
+        lane: str = "default",
+        priority: int = 0,
+        max_attempts: int = 5,
+        run_at=None,
+    ) -> "Job":
+        """Queue a job running the registered task with the payload as kwargs"""
+        return self.create(
+            task=task,
+            payload=payload or {},
+            lane=lane,
+            priority=priority,
+            max_attempts=max_attempts,
+            run_at=run_at or timezone.now(),
+        )
+
+    def claim(
+        self, lanes: t.Sequence[str], lease_seconds: float, batch_size: int = 1
+    ) -> list["Job"]:
+        """Lease the next due jobs of the lanes, highest priority first
+
+        Rows locked by another worker are skipped rather than waited for, so
+        workers never block each other. A claimed job is due again once its
+        lease expires, which hands the jobs of a crashed worker to the others.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            jobs = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    lane__in=lanes,
+                    status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+                    run_at__lte=now,
+                )
+                .order_by("-priority", "run_at", "id")[:batch_size]
+            )
+            if not jobs:
+                return []
+            lease_expires_at = now + timedelta(seconds=lease_seconds)
+            self.filter(pk__in=[job.pk for job in jobs]).update(
+                status=Job.Status.RUNNING,
+                attempts=m.F("attempts") + 1,
+                run_at=lease_expires_at,
+            )
+        for job in jobs:
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            job.run_at = lease_expires_at
+        return jobs
+
+    def renew_lease(self, job: "Job", lease_seconds: float) -> bool:
+        """Lease a claimed job from now, return False if its lease was lost
+
+        A job whose lease expired may have been claimed again by another
+        worker, which counted another attempt.
+        """
+        lease_expires_at = timezone.now() + timedelta(seconds=lease_seconds)
+        renewed = self.filter(
+            pk=job.pk, status=Job.Status.RUNNING, attempts=job.attempts
+        ).update(run_at=lease_expires_at)
+        if renewed:
+            job.run_at = lease_expires_at
+        return bool(renewed)
+
+
+class Job(m.Model):
+    """Task queued for a run_jobs worker
+
+    Jobs are deleted once they succeed, so the table only holds pending,
+    running and failed jobs.
+    """
+
+    class Status(m.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    # Name the task was registered under, see core.jobs.task
+    task = m.CharField(max_length=255)
+    payload = m.JSONField(default=dict)
+    # Workers only claim the jobs of the lanes they serve
+    lane = m.CharField(max_length=50, default="default")
+    priority = m.SmallIntegerField(default=0)
+    status = m.CharField(max_length=7, choices=Status.choices, default=Status.QUEUED)
+    attempts = m.PositiveSmallIntegerField(default=0)
+    max_attempts = m.PositiveSmallIntegerField(default=5)
+    # When a queued job is due, or when a running job's lease expires
+    run_at = m.DateTimeField(default=timezone.now)
+    last_error = m.TextField(blank=True)
+    created_at = m.DateTimeField(auto_now_add=True)
+
+    objects = JobManager()
+
+    class Meta:
+        indexes = [
+            m.Index(
+                fields=["lane", "-priority", "run_at"],
+                name="core_job_claim_idx",
+                condition=m.Q(status__in=["queued", "running"]),
+            )
+        ]
+
+
+class TokenUsageManager(m.Manager):
+    """Manager for the usage of the auth tokens"""
+
+    def last_used_at(self, token: Token):
+        """Return when the token was last used, or created if never recorded"""
+        try:
+            return token.usage.last_used_at
+        except TokenUsage.DoesNotExist:
+            return token.created
+
+    def is_expired(self, token: Token, now=None) -> bool:
+        """Return whether the token went unused for longer than its TTL"""
+        idle = (now or timezone.now()) - self.last_used_at(token)
+        return idle >= timedelta(hours=settings.AUTH_TOKEN_TTL_HOURS)
+
+    def touch(self, token: Token, now=None) -> None:
+        """Record a use of the token
+
+        The usage is only written once it is older than
+        AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS, so most requests just read it
+        along with the token.
+        """
+        now = now or timezone.now()
+        try:
+            last_used_at = token.usage.last_used_at
+        except TokenUsage.DoesNotExist:
+            self.bulk_create(
+                [TokenUsage(token=token, last_used_at=now)], ignore_conflicts=True
+            )
+            return
+
+        resolution = timedelta(seconds=settings.AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS)
+        if now - last_used_at >= resolution:
+            # Concurrent requests with the token only write once
+            self.filter(token=token, last_used_at__lte=now - resolution).update(
+                last_used_at=now
+            )
+
+    def issue(self, user) -> Token:
+        """Return the user's token, replacing it with a new one once expired"""
+        now = timezone.now()
+        token, created = Token.objects.select_related("usage").get_or_create(user=user)
+        if not created and self.is_expired(token, now):
+            Token.objects.filter(pk=token.pk).delete()
+            token, created = Token.objects.get_or_create(user=user)
+        if created:
+            self.create(token=token, last_used_at=now)
+        return token
+
+    def purge(self, batch_size: int = 500, pause: float = 0) -> int:
+        """Delete the expired tokens in batches, return the count
+
+        Each batch is deleted in its own short transaction, pausing in between
+        so vacuum and the replicas keep up with a large backlog.
+        """
+        cutoff = timezone.now() - timedelta(hours=settings.AUTH_TOKEN_TTL_HOURS)
+        expired = [
+            self.filter(last_used_at__lt=cutoff).values_list("token_id", flat=True),
+            Token.objects.filter(usage__isnull=True, created__lt=cutoff).values_list(
+                "pk", flat=True
+            ),
+        ]
+        deleted = 0
+        for keys in expired:
+            while True:
+                batch = list(keys[:batch_size])
+                if not batch:
+                    break
+                deleted += (
+                    Token.objects.filter(pk__in=batch)
+                    .delete()[1]
+                    .get(Token._meta.label, 0)
+                )
+                if pause:
+                    time.sleep(pause)
+        return deleted
+
+
+class TokenUsage(m.Model):
+    """When an auth token was last used, tokens expire once left unused
+
+    Kept apart from the token so recording a use doesn't rewrite the token
+    row and its lookup index.
+    """
+
+    token = m.OneToOneField(
+        Token, on_delete=m.CASCADE, primary_key=True, related_name="usage"
+    )
+    last_used_at = m.DateTimeField(db_index=True)
+
+    objects = TokenUsageManager()
@@ -0,0 +1,27 @@
+"""
+Additional parsers for the API requests
+"""
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Parse MessagePack request bodies"""
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+# Parsers to accept on top of the defaults, MessagePack needs the optional
+# msgpack package
+OPTIONAL_PARSERS = [MessagePackParser] if msgpack else []
@@ -0,0 +1,30 @@
+"""
+Additional renderers for the API responses
+"""
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Render the response as MessagePack, a compact binary alternative to JSON"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Types msgpack can't pack (e.g. dates) are converted like the JSON API
+        return msgpack.packb(data, default=JSONEncoder().default)
+
+
+# Renderers to offer on top of the defaults, MessagePack needs the optional
+# msgpack package
+OPTIONAL_RENDERERS = [MessagePackRenderer] if msgpack else []
@@ -0,0 +1,116 @@
+"""
+OpenAPI schema served from an artifact built once per process
+
+Generating the schema introspects every view and serializer, so it is done at
+most once per process: read from OPENAPI_SCHEMA_FILE when it was built with
+`manage.py spectacular --format openapi-json --file <path>` (see the
+Dockerfile), otherwise generated on the first request. Each format is then
+rendered and gzipped once and served with an ETag, so a new schema is only
+picked up by new processes, i.e. on deploy.
+"""
+import gzip
+import hashlib
+import json
+import re
+import threading
+import typing as t
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.views import SpectacularAPIView
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+@dataclass(frozen=True)
+class SchemaArtifact:
+    """A rendered schema, its gzipped copy and their ETag"""
+
+    content: bytes
+    compressed: bytes
+    content_type: str
+    etag: str
+
+
+_schemas: dict[str, dict[str, t.Any]] = {}
+_artifacts: dict[tuple[str, str], SchemaArtifact] = {}
+_lock = threading.Lock()
+
+
+def build_artifact(content: bytes, content_type: str) -> SchemaArtifact:
+    """Compress the rendered schema and compute its ETag"""
+    return SchemaArtifact(
+        content=content,
+        compressed=gzip.compress(content, compresslevel=9, mtime=0),
+        content_type=content_type,
+        # Weak as the gzipped and identity representations share it
+        etag=f'W/"{hashlib.sha256(content).hexdigest()[:32]}"',
+    )
+
+
+def clear_cache():
+    """Drop the cached schemas so the next request rebuilds them"""
+    with _lock:
+        _schemas.clear()
+        _artifacts.clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """OpenAPI schema view serving the cached artifacts"""
+
+    def _get_schema(self, language: str) -> dict[str, t.Any]:
+        """Return the schema for the language, loading or generating it once"""
+        if language not in _schemas:
+            schema_file = settings.OPENAPI_SCHEMA_FILE
+            if schema_file and language == settings.LANGUAGE_CODE:
+                with open(schema_file) as f:
+                    _schemas[language] = json.load(f)
+            else:
+                generator = self.generator_class(
+                    urlconf=self.urlconf, api_version=self.api_version
+                )
+                _schemas[language] = generator.get_schema(
+                    request=None, public=self.serve_public
+                )
+        return _schemas[language]
+
+    def _get_artifact(self, request) -> SchemaArtifact:
+        renderer = request.accepted_renderer
+        language = translation.get_language()
+        key = (renderer.media_type, language)
+        if key not in _artifacts:
+            with _lock:
+                if key not in _artifacts:
+                    content = renderer.render(
+                        self._get_schema(language),
+                        renderer.media_type,
+                        self.get_renderer_context(),
+                    )
+                    content_type = renderer.media_type
+                    if renderer.charset:
+                        content_type += f"; charset={renderer.charset}"
+                    _artifacts[key] = build_artifact(content, content_type)
+        return _artifacts[key]
+
+    def _get_schema_response(self, request):
+        artifact = self._get_artifact(request)
+
+        response = get_conditional_response(request, etag=artifact.etag)
+        if response is None:
+            if ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+                response = HttpResponse(
+                    artifact.compressed, content_type=artifact.content_type
+                )
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(
+                    artifact.content, content_type=artifact.content_type
+                )
+        response["ETag"] = artifact.etag
+        response["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -0,0 +1,102 @@
+"""
+Query budget assertions for the API tests
+
+Budgets cap the number of data queries an endpoint may make, excluding
+authentication (tests force authenticate) and transaction control statements
+(savepoints). Raise a budget only when an extra query is intended.
+"""
+import contextlib
+import typing as t
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    # Quote API
+    ("quote:quote-list", "GET"): 1,
+    ("quote:quote-detail", "GET"): 1,
+    # Insert the quote, update or create the user's summary, record the price,
+    # lock the user's event feed and append the event
+    ("quote:quote-list", "POST"): 6,
+    # Fetch and update the quote, update or create the user's summary, record
+    # the new price, lock the user's event feed and append the event
+    ("quote:quote-detail", "PATCH"): 7,
+    ("quote:quote-detail", "PUT"): 7,
+    # Fetch the quote, update the user's summary, append the event, delete the
+    # quote
+    ("quote:quote-detail", "DELETE"): 5,
+    ("quote:quote-summary", "GET"): 1,
+    ("quote:quote-events", "GET"): 1,
+    # Prices are computed from the rates in code, nothing is read or written
+    ("quote:quote-price-matrix", "GET"): 0,
+    # User API
+    ("user:create", "POST"): 2,
+    # Authenticate the user, fetch their token and its usage, or create both
+    ("user:token", "POST"): 4,
+    ("user:about", "GET"): 0,
+    # Saving the profile then the new password
+    ("user:about", "PATCH"): 2,
+}
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def _data_queries(captured_queries: list[dict[str, str]]) -> list[str]:
+    """Return the SQL of the captured queries that read or write data"""
+    return [
+        query["sql"]
+        for query in captured_queries
+        if not query["sql"].startswith(TRANSACTION_CONTROL)
+    ]
+
+
+class QueryBudgetMixin:
+    """Assertions for the number of queries made by the API endpoints"""
+
+    @contextlib.contextmanager
+    def assertWithinQueryBudget(
+        self, endpoint: str, method: str = "GET"
+    ) -> t.Iterator[None]:
+        """Assert the requests made in the block stay within the endpoint budget"""
+        budget = QUERY_BUDGETS[(endpoint, method)]
+        with CaptureQueriesContext(connection) as context:
+            yield
+
+        queries = _data_queries(context.captured_queries)
+        if len(queries) > budget:
+            self.fail(  # type: ignore
+                f"{method} {endpoint} made {len(queries)} queries, over its "
+                f"budget of {budget}:\n" + "\n".join(queries)
+            )
+
+    def assertQueriesDoNotScale(
+        self,
+        endpoint: str,
+        create_rows: t.Callable[[int], t.Any],
+        request: t.Callable[[], t.Any],
+        row_counts: tuple[int, ...] = (1, 5, 25),
+        method: str = "GET",
+    ):
+        """Assert the number of queries stays the same as rows are added
+
+        `create_rows` is called with the number of rows to add before each
+        request so the endpoint returns each of the `row_counts` in turn.
+        """
+        query_counts = []
+        total = 0
+        for row_count in row_counts:
+            create_rows(row_count - total)
+            total = row_count
+            with self.assertWithinQueryBudget(endpoint, method):
+                with CaptureQueriesContext(connection) as context:
+                    request()
+            query_counts.append(len(_data_queries(context.captured_queries)))
+
+        if len(set(query_counts)) > 1:
+            counts = ", ".join(
+                f"{count} queries for {rows} rows"
+                for rows, count in zip(row_counts, query_counts)
+            )
+            self.fail(  # type: ignore
+                f"{method} {endpoint} queries scale with the number of rows: {counts}"
+            )
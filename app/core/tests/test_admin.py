@@ -1,9 +1,16 @@
 """
 Tests for the Django admin modifications
 """
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.admin import EstimatedCountPaginator
+from core.models import Quote
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
@@ -46,3 +53,78 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class QuoteAdminTests(TestCase):
+    """Tests for the quote admin pages"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com",
+            password="testPassword123",
+        )
+        self.client.force_login(self.admin_user)
+        self.quotes = Quote.objects.bulk_create(
+            Quote(
+                user=self.admin_user,
+                buyer_first_name="Test",
+                buyer_last_name=f"Buyer{state}",
+                state=state,
+                flat_cost_coverages={"type_coverage": "Basic", "pet_coverage": False},
+                percentage_cost_coverages={"flood_coverage": False},
+                monthly_total=Decimal("20.40"),
+            )
+            for state in ("CA", "NY", "TX")
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_quote")
+
+    def test_quotes_list(self):
+        """Test quotes are listed and filtered by state"""
+        url = reverse("admin:core_quote_changelist")
+        res = self.client.get(url)
+
+        self.assertContains(res, "BuyerCA")
+        self.assertContains(res, "BuyerTX")
+
+        res = self.client.get(url, {"state__exact": "NY"})
+
+        self.assertContains(res, "BuyerNY")
+        self.assertNotContains(res, "BuyerCA")
+
+    @patch.object(EstimatedCountPaginator, "exact_count_threshold", 1)
+    def test_quotes_list_estimated_count(self):
+        """Test the quote list is counted from the partition estimates"""
+        url = reverse("admin:core_quote_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+
+        self.assertEqual(res.context["cl"].result_count, 3)
+        self.assertFalse(
+            any("COUNT(*)" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_estimated_count_filtered(self):
+        """Test filtered querysets are counted exactly up to the limit"""
+        queryset = Quote.objects.order_by("id")
+
+        self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 3)
+        self.assertEqual(
+            EstimatedCountPaginator(queryset.filter(state="NY"), 10).count, 1
+        )
+        with patch.object(EstimatedCountPaginator, "max_count", 2):
+            self.assertEqual(
+                EstimatedCountPaginator(
+                    queryset.filter(state__in=["CA", "NY", "TX"]), 10
+                ).count,
+                2,
+            )
+
+    def test_edit_quote_page(self):
+        """Test the edit quote page works"""
+        url = reverse("admin:core_quote_change", args=[self.quotes[0].id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "20.40")
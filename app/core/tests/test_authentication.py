@@ -0,0 +1,66 @@
+"""
+Tests for the API authentication
+"""
+from datetime import timedelta
+
+from core.authentication import TokenAuthentication
+from core.models import TokenUsage
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+
+@override_settings(AUTH_TOKEN_TTL_HOURS=24, AUTH_TOKEN_LAST_USED_RESOLUTION_SECONDS=60)
+class TokenAuthenticationTests(TestCase):
+    """Test authenticating with expiring tokens"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+        self.token = TokenUsage.objects.issue(self.user)
+
+    def _set_last_used(self, **ago):
+        last_used_at = timezone.now() - timedelta(**ago)
+        TokenUsage.objects.update(last_used_at=last_used_at)
+        return last_used_at
+
+    def test_authenticate(self):
+        """Test a token authenticates its user without recording a recent use"""
+        last_used_at = self._set_last_used(seconds=30)
+
+        with self.assertNumQueries(1):
+            user, token = TokenAuthentication().authenticate_credentials(self.token.key)
+
+        self.assertEqual((user, token), (self.user, self.token))
+        self.assertEqual(TokenUsage.objects.get().last_used_at, last_used_at)
+
+    def test_last_used_updated_coarsely(self):
+        """Test a use is recorded once the last one is older than the resolution"""
+        last_used_at = self._set_last_used(minutes=5)
+
+        TokenAuthentication().authenticate_credentials(self.token.key)
+
+        self.assertGreater(TokenUsage.objects.get().last_used_at, last_used_at)
+
+    def test_expired_token_rejected(self):
+        """Test a token unused for longer than the TTL is rejected"""
+        self._set_last_used(hours=25)
+
+        with self.assertRaisesMessage(AuthenticationFailed, "Token has expired."):
+            TokenAuthentication().authenticate_credentials(self.token.key)
+
+    def test_token_without_usage(self):
+        """Test a token without recorded usage expires from its creation"""
+        TokenUsage.objects.all().delete()
+
+        TokenAuthentication().authenticate_credentials(self.token.key)
+        self.assertTrue(TokenUsage.objects.filter(token=self.token).exists())
+
+        TokenUsage.objects.all().delete()
+        Token.objects.update(created=timezone.now() - timedelta(hours=25))
+        with self.assertRaises(AuthenticationFailed):
+            TokenAuthentication().authenticate_credentials(self.token.key)
@@ -1,43 +1,267 @@
 """
 Test custom Django management commands
 """
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from core.benchmarking import machine_id
+from core.management.commands.profile_startup import parse_import_times
+from core.models import IdempotencyKey
+from core.models import QuoteSummary
+from core.models import TokenUsage
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
+from django.test import LiveServerTestCase
 from django.test import SimpleTestCase
+from django.test import TestCase
+from django.utils import timezone
 from psycopg2 import OperationalError as Psycopg2OpError
+from rest_framework.authtoken.models import Token
 
 
-@patch("core.management.commands.wait_for_db.Command.check")
+@patch("django.db.backends.postgresql.base.DatabaseWrapper.ensure_connection")
 class CommandTests(SimpleTestCase):
     """Test commands"""
 
-    def test_wait_for_db_ready(self, patched_check: MagicMock):
+    def test_wait_for_db_ready(self, patched_ensure_connection: MagicMock):
         """Test waiting for database if database ready"""
-        patched_check.return_value = True
+        call_command("wait_for_db", stdout=StringIO())
 
-        call_command("wait_for_db")
-
-        patched_check.assert_called_once_with(databases=["default"])
+        patched_ensure_connection.assert_called_once_with()
 
+    @patch("random.uniform", side_effect=lambda low, high: high)
     @patch("time.sleep")
     def test_wait_for_db_delay(
         self,
         patched_sleep: MagicMock,
-        patched_check: MagicMock,
+        patched_uniform: MagicMock,
+        patched_ensure_connection: MagicMock,
     ):
         """Test waiting for database when getting OperationalError"""
-        # The first 2 checks raise Psycopg2OpError
-        # The next 3 checks raise an OperationalError
-        # The sixth check will return True to indicate the DB is ready
-        patched_check.side_effect = (
-            [Psycopg2OpError] * 2 + [OperationalError] * 3 + [True]
+        # The first 2 attempts raise Psycopg2OpError
+        # The next 3 attempts raise an OperationalError
+        # The sixth attempt connects
+        patched_ensure_connection.side_effect = (
+            [Psycopg2OpError] * 2 + [OperationalError] * 3 + [None]
+        )
+
+        call_command("wait_for_db", "--max-delay", "1", stdout=StringIO())
+
+        # The delay doubles after each attempt, up to the maximum
+        self.assertEqual(patched_ensure_connection.call_count, 6)
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.1, 0.2, 0.4, 0.8, 1],
+        )
+
+    @patch("time.sleep")
+    def test_wait_for_db_timeout(
+        self,
+        patched_sleep: MagicMock,
+        patched_ensure_connection: MagicMock,
+    ):
+        """Test giving up once the timeout has passed"""
+        patched_ensure_connection.side_effect = OperationalError
+
+        with self.assertRaisesMessage(CommandError, "after 0 seconds"):
+            call_command("wait_for_db", "--timeout", "0", stdout=StringIO())
+
+        patched_ensure_connection.assert_called_once_with()
+        patched_sleep.assert_not_called()
+
+
+class RebuildQuoteSummariesCommandTests(TestCase):
+    """Test the rebuild_quote_summaries command"""
+
+    def test_rebuild_quote_summaries(self):
+        """Test stale summaries are replaced by the rebuilt values"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+        QuoteSummary.objects.apply_delta(user, quote_count=3)
+
+        out = StringIO()
+        call_command("rebuild_quote_summaries", stdout=out)
+
+        self.assertFalse(QuoteSummary.objects.filter(user=user).exists())
+        self.assertIn("Rebuilt 0 quote summaries", out.getvalue())
+
+
+class PurgeIdempotencyKeysCommandTests(TestCase):
+    """Test the purge_idempotency_keys command"""
+
+    def test_purge_expired_keys(self):
+        """Test only keys older than the TTL are deleted"""
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+        for i in range(3):
+            IdempotencyKey.objects.create(user=user, key=f"old-{i}")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        IdempotencyKey.objects.create(user=user, key="new")
+
+        out = StringIO()
+        call_command("purge_idempotency_keys", "--batch-size=2", stdout=out)
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"]
+        )
+        self.assertIn("Deleted 3 expired idempotency keys", out.getvalue())
+
+
+class PurgeExpiredTokensCommandTests(TestCase):
+    """Test the purge_expired_tokens command"""
+
+    def test_purge_expired_tokens(self):
+        """Test only tokens unused for longer than the TTL are deleted"""
+        users = [
+            get_user_model().objects.create_user(
+                email=f"test{i}@example.com", password="testPass123"
+            )
+            for i in range(4)
+        ]
+        tokens = [TokenUsage.objects.issue(user) for user in users]
+        TokenUsage.objects.filter(token__in=tokens[:2]).update(
+            last_used_at=timezone.now() - timedelta(days=31)
+        )
+        # Tokens without recorded usage expire from their creation
+        TokenUsage.objects.filter(token=tokens[2]).delete()
+        Token.objects.filter(pk=tokens[2].pk).update(
+            created=timezone.now() - timedelta(days=31)
+        )
+
+        out = StringIO()
+        call_command("purge_expired_tokens", "--batch-size=1", "--pause=0", stdout=out)
+
+        self.assertEqual(list(Token.objects.all()), [tokens[3]])
+        self.assertEqual(TokenUsage.objects.get().token_id, tokens[3].pk)
+        self.assertIn("Deleted 3 expired tokens", out.getvalue())
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    """Test the benchmark command"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.baseline = Path(self.tmp_dir.name) / "baseline.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_baseline(self):
+        """Test saving the results of the matching benchmarks as the baseline"""
+        call_command(
+            "benchmark",
+            "--filter=pricing",
+            "--repeat=1",
+            f"--baseline={self.baseline}",
+            "--save-baseline",
+            stdout=StringIO(),
+        )
+
+        baselines = json.loads(self.baseline.read_text())
+        self.assertEqual(list(baselines), [machine_id()])
+        self.assertEqual(
+            list(baselines[machine_id()]), ["pricing.calculate_quote_cost"]
+        )
+
+    def test_regression_against_baseline(self):
+        """Test benchmarks slower than the baseline fail the command"""
+        self.baseline.write_text(
+            json.dumps({machine_id(): {"pricing.calculate_quote_cost": 1e-12}})
+        )
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark",
+                "--filter=pricing",
+                "--repeat=1",
+                f"--baseline={self.baseline}",
+                stdout=out,
+            )
+        self.assertIn("pricing.calculate_quote_cost", out.getvalue())
+
+    def test_baseline_of_another_machine(self):
+        """Test the results are only reported without a baseline for this machine"""
+        self.baseline.write_text(
+            json.dumps({"other machine": {"pricing.calculate_quote_cost": 1e-12}})
+        )
+
+        out = StringIO()
+        call_command(
+            "benchmark",
+            "--filter=pricing",
+            "--repeat=1",
+            f"--baseline={self.baseline}",
+            stdout=out,
+        )
+
+        self.assertIn("No baseline saved for this machine", out.getvalue())
+        self.assertIn("pricing.calculate_quote_cost", out.getvalue())
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test the loadtest command against a live server"""
+
+    def test_loadtest_reports_each_action(self):
+        """Test sending the traffic mix and reporting latency per action"""
+        out = StringIO()
+        call_command(
+            "loadtest",
+            f"--url={self.live_server_url}",
+            "--users=2",
+            "--rps=40",
+            "--duration=1",
+            "--concurrency=1",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        for action in ("create", "list", "retrieve", "update", "total"):
+            self.assertIn(action, output)
+        total = next(line for line in output.splitlines() if line.startswith("total"))
+        requests, errors = total.split()[1:3]
+        self.assertEqual(requests, "40")
+        self.assertEqual(errors, "0")
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_loadtest_unknown_action(self):
+        """Test an unknown action in the mix fails the command"""
+        with self.assertRaises(CommandError):
+            call_command("loadtest", "--mix=delete=1", stdout=StringIO())
+
+
+class ProfileStartupCommandTests(SimpleTestCase):
+    """Test the profile_startup command"""
+
+    def test_parse_import_times(self):
+        """Test parsing the self and cumulative time of nested imports"""
+        times = parse_import_times(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     yaml.reader\n"
+            "import time:       540 |        660 |   yaml\n"
+        )
+
+        self.assertEqual(
+            [
+                (item.module, item.self_us, item.cumulative_us, item.depth)
+                for item in times
+            ],
+            [("yaml.reader", 120, 120, 2), ("yaml", 540, 660, 1)],
         )
 
-        call_command("wait_for_db")
+    def test_profile_startup(self):
+        """Test reporting the startup phases and the slowest packages"""
+        out = StringIO()
+        call_command("profile_startup", "--limit=5", stdout=out)
 
-        # Check that the DB was checked 6 times in total
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=["default"])
+        output = out.getvalue()
+        self.assertIn("django.setup()", output)
+        self.assertIn("urlconf", output)
+        self.assertIn("django ", output)
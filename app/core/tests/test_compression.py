@@ -0,0 +1,74 @@
+"""
+Tests for the response compression middleware
+"""
+import gzip
+import unittest
+
+from core.middleware import brotli
+from core.middleware import CompressionMiddleware
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+
+CONTENT = b'{"buyer_first_name": "Test", "buyer_last_name": "User"}' * 20
+
+
+def _get(accept_encoding: str, response: HttpResponse | None = None):
+    """Return the response of the middleware for a request"""
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    if response is None:
+        response = HttpResponse(CONTENT, content_type="application/json")
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses"""
+
+    def test_gzip(self):
+        """Test compressing with gzip when the client only accepts gzip"""
+        res = _get("gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), CONTENT)
+        self.assertEqual(res["Content-Length"], str(len(res.content)))
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    @unittest.skipUnless(brotli, "brotli is not installed")
+    def test_brotli_preferred(self):
+        """Test brotli is preferred over gzip unless given a lower quality"""
+        res = _get("gzip, deflate, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(res.content), CONTENT)
+        self.assertEqual(_get("gzip, br;q=0.5")["Content-Encoding"], "gzip")
+
+    def test_not_accepted(self):
+        """Test responses are sent as they are without an accepted encoding"""
+        for accept_encoding in ("", "identity", "gzip;q=0, br;q=0", "*;q=0"):
+            with self.subTest(accept_encoding=accept_encoding):
+                res = _get(accept_encoding)
+
+                self.assertFalse(res.has_header("Content-Encoding"))
+                self.assertEqual(res.content, CONTENT)
+
+    def test_skipped_responses(self):
+        """Test small, streaming and already encoded responses are skipped"""
+        encoded = HttpResponse(gzip.compress(CONTENT))
+        encoded["Content-Encoding"] = "gzip"
+        responses = [
+            HttpResponse(b"{}"),
+            StreamingHttpResponse(iter([CONTENT])),
+            encoded,
+        ]
+        for response in responses:
+            with self.subTest(response=response):
+                self.assertIs(_get("gzip, br", response), response)
+                self.assertFalse(response.has_header("Vary"))
+
+    def test_etag_weakened(self):
+        """Test the ETag of a compressed response is made weak"""
+        response = HttpResponse(CONTENT)
+        response["ETag"] = '"abc"'
+
+        self.assertEqual(_get("gzip", response)["ETag"], 'W/"abc"')
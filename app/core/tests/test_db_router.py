@@ -0,0 +1,126 @@
+"""
+Tests for the read replica database router
+"""
+import tempfile
+
+from core import db_router
+from core.models import Quote
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+# A cache every process shares, so reads may be routed to the replicas
+SHARED_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tempfile.mkdtemp(prefix="db-router-tests-"),
+    }
+}
+
+
+class _User:
+    """Stand-in for a user, the router only needs the primary key"""
+
+    def __init__(self, pk: int):
+        self.pk = pk
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica_0"],
+    DATABASE_REPLICA_STICKY_SECONDS=5,
+    CACHES=SHARED_CACHES,
+)
+class ReplicaRouterTests(SimpleTestCase):
+    """Test routing reads to the replicas"""
+
+    def setUp(self):
+        self.router = db_router.ReplicaRouter()
+        cache.clear()
+
+    def test_reads_use_primary_by_default(self):
+        """Test reads outside of replica_reads are not routed to a replica"""
+        self.assertIsNone(self.router.db_for_read(Quote))
+        self.assertEqual(self.router.db_for_write(Quote), "default")
+
+    def test_replica_reads(self):
+        """Test reads inside replica_reads are routed to a replica"""
+        with db_router.replica_reads(_User(1)):
+            self.assertEqual(self.router.db_for_read(Quote), "replica_0")
+            self.assertEqual(self.router.db_for_write(Quote), "default")
+
+        self.assertIsNone(self.router.db_for_read(Quote))
+
+    def test_pinned_user_reads_from_primary(self):
+        """Test a user who just wrote reads their own writes from the primary"""
+        db_router.pin_to_primary(_User(1))
+
+        self.assertTrue(db_router.is_pinned_to_primary(_User(1)))
+        with db_router.replica_reads(_User(1)):
+            self.assertIsNone(self.router.db_for_read(Quote))
+        with db_router.replica_reads(_User(2)):
+            self.assertEqual(self.router.db_for_read(Quote), "replica_0")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        """Test reads stay on the primary without any replicas"""
+        db_router.pin_to_primary(_User(1))
+
+        self.assertFalse(db_router.is_pinned_to_primary(_User(1)))
+        with db_router.replica_reads(_User(1)):
+            self.assertIsNone(self.router.db_for_read(Quote))
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_process_local_cache(self):
+        """Test reads stay on the primary when other processes can't see pins"""
+        self.assertFalse(db_router.pins_are_shared())
+        with db_router.replica_reads(_User(1)):
+            self.assertIsNone(self.router.db_for_read(Quote))
+
+    def test_migrations_only_run_on_primary(self):
+        """Test replicas are never migrated"""
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "core"))
+
+
+# The primary stands in for a replica so the routed reads can be served
+@override_settings(
+    DATABASE_REPLICAS=["default"],
+    DATABASE_REPLICA_STICKY_SECONDS=5,
+    CACHES=SHARED_CACHES,
+)
+class ReplicaRoutingAPITests(TestCase):
+    """Test the quote API routes reads to the replicas"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPassword123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_write_pins_user_to_primary(self):
+        """Test creating a quote pins the user's reads to the primary"""
+        self.assertFalse(db_router.is_pinned_to_primary(self.user))
+        payload = {
+            "buyer_first_name": "Test",
+            "buyer_last_name": "User",
+            "state": "CA",
+            "flat_cost_coverages": {"type_coverage": "Basic", "pet_coverage": True},
+            "percentage_cost_coverages": {"flood_coverage": True},
+        }
+        res = self.client.post(reverse("quote:quote-list"), payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertTrue(db_router.is_pinned_to_primary(self.user))
+        res = self.client.get(reverse("quote:quote-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
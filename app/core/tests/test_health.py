@@ -0,0 +1,45 @@
+"""
+Tests for the liveness and readiness probes
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import override_settings
+from django.test import TestCase
+
+LIVENESS_URL = "/health/live/"
+READINESS_URL = "/health/ready/"
+
+
+class HealthCheckTests(TestCase):
+    """Test the health check middleware"""
+
+    @override_settings(ALLOWED_HOSTS=["example.com"])
+    def test_liveness(self):
+        """Test liveness answers without queries, even for unknown hosts"""
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVENESS_URL, HTTP_HOST="10.0.0.1")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"ok")
+
+    def test_readiness_ping_cached(self):
+        """Test readiness pings the database once per cache period"""
+        with self.assertNumQueries(1):
+            res = self.client.get(READINESS_URL)
+            self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+        with override_settings(HEALTH_CHECK_DB_CACHE_SECONDS=0):
+            with self.assertNumQueries(1):
+                self.client.get(READINESS_URL)
+
+    def test_readiness_database_unavailable(self):
+        """Test readiness fails while the database is unavailable"""
+        with patch.object(connection, "cursor", side_effect=OperationalError):
+            res = self.client.get(READINESS_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.content, b"unavailable")
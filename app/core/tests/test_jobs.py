@@ -0,0 +1,175 @@
+"""
+Tests for the background job queue
+"""
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from core.jobs import task
+from core.jobs import Worker
+from core.models import Job
+from django.core.management import call_command
+from django.db import connection
+from django.db import transaction
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+CALLS: list[int] = []
+
+
+@task("core.tests.record")
+def record(value: int) -> None:
+    CALLS.append(value)
+
+
+SLOW_CLAIMS: list[Job] = []
+
+
+@task("core.tests.slow")
+def slow() -> None:
+    # Outlive the lease of the last job claimed with this one, which another
+    # worker then claims again
+    last = Job.objects.filter(task=record.name).latest("id")
+    Job.objects.filter(pk=last.pk).update(run_at=timezone.now())
+    SLOW_CLAIMS.extend(Job.objects.claim(["default"], lease_seconds=60))
+
+
+@task("core.tests.fail", max_attempts=2)
+def fail() -> None:
+    raise ValueError("Task failed")
+
+
+class JobQueueTests(TestCase):
+    """Test queueing and running jobs"""
+
+    def setUp(self):
+        CALLS.clear()
+        SLOW_CLAIMS.clear()
+
+    def test_run_job(self):
+        """Test a worker runs the task with the job's kwargs, then deletes it"""
+        record.enqueue(value=1)
+
+        claimed = Worker().run_batch()
+
+        self.assertEqual(claimed, 1)
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_priority_and_lanes(self):
+        """Test workers claim their lanes' due jobs, highest priority first"""
+        record.enqueue(value=1)
+        record.enqueue(value=2, priority=10)
+        record.enqueue(value=3, run_at=timezone.now() + timedelta(hours=1))
+        Job.objects.enqueue(record.name, {"value": 4}, lane="bulk")
+
+        Worker(lanes=["default"], batch_size=1).run_batch()
+        Worker(lanes=["default"]).run_batch()
+
+        self.assertEqual(CALLS, [2, 1])
+        self.assertEqual(Job.objects.count(), 2)
+
+        Worker(lanes=["bulk"]).run_batch()
+
+        self.assertEqual(CALLS, [2, 1, 4])
+
+    def test_failed_job_retried(self):
+        """Test a failed job is retried later until it runs out of attempts"""
+        job = fail.enqueue()
+
+        with self.assertLogs("core.jobs", "WARNING"):
+            Worker().run_batch()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=4))
+        self.assertIn("ValueError: Task failed", job.last_error)
+        self.assertEqual(Worker().run_batch(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("core.jobs", "ERROR"):
+            Worker().run_batch()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_task(self):
+        """Test a job for a task that isn't registered fails"""
+        job = Job.objects.enqueue("core.tests.missing", max_attempts=1)
+
+        with self.assertLogs("core.jobs", "ERROR"):
+            Worker().run_batch()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("No task is registered as core.tests.missing", job.last_error)
+
+    def test_expired_lease_reclaimed(self):
+        """Test the job of a worker that died is run once its lease expires"""
+        record.enqueue(value=1)
+        Job.objects.claim(["default"], lease_seconds=60)
+
+        self.assertEqual(Worker().run_batch(), 0)
+
+        Job.objects.update(run_at=timezone.now())
+        Worker().run_batch()
+
+        self.assertEqual(CALLS, [1])
+
+    def test_lease_renewed_per_job(self):
+        """Test a slow batch renews each job's lease and deletes the succeeded"""
+        first = slow.enqueue()
+        second = record.enqueue(value=1)
+        third = record.enqueue(value=2)
+
+        with patch("core.jobs.LEASE_RENEW_AFTER", 0), self.assertLogs(
+            "core.jobs", "WARNING"
+        ):
+            claimed = Worker(lease_seconds=60, batch_size=3).run_batch()
+
+        # The third job was left to the worker that claimed it again
+        self.assertEqual(claimed, 3)
+        self.assertEqual([job.pk for job in SLOW_CLAIMS], [third.pk])
+        self.assertEqual(CALLS, [1])
+        self.assertEqual(list(Job.objects.values_list("pk", flat=True)), [third.pk])
+        self.assertFalse(Job.objects.filter(pk__in=[first.pk, second.pk]).exists())
+
+    def test_run_jobs_command(self):
+        """Test the run_jobs command runs the due jobs and exits in burst mode"""
+        for value in range(3):
+            record.enqueue(value=value)
+        out = StringIO()
+
+        call_command("run_jobs", "--burst", "--batch-size", "2", stdout=out)
+
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+        self.assertIn("Processed 3 jobs!", out.getvalue())
+
+
+class JobClaimConcurrencyTests(TransactionTestCase):
+    """Test workers claiming jobs concurrently"""
+
+    def test_locked_jobs_skipped(self):
+        """Test a worker skips the jobs locked by another worker"""
+        first = record.enqueue(value=1)
+        second = record.enqueue(value=2)
+        claimed = []
+
+        def claim():
+            try:
+                claimed.extend(Job.objects.claim(["default"], lease_seconds=60))
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            Job.objects.select_for_update().get(pk=first.pk)
+            thread = threading.Thread(target=claim)
+            thread.start()
+            thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([job.pk for job in claimed], [second.pk])
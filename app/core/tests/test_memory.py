@@ -0,0 +1,77 @@
+"""
+Tests for the memory profiling endpoint
+"""
+import tracemalloc
+
+from core.memory import PROFILER
+from core.models import Quote
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+MEMORY_PROFILE_URL = reverse("memory-profile")
+
+
+@override_settings(MEMORY_PROFILING_ENABLED=True)
+class MemoryProfileTests(TestCase):
+    """Test profiling the memory of the worker"""
+
+    def setUp(self):
+        self.addCleanup(PROFILER.stop)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPass123"
+        )
+
+    def test_staff_only(self):
+        """Test only staff users can profile the memory"""
+        res = self.client.post(MEMORY_PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(self.user)
+        res = self.client.post(MEMORY_PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    @override_settings(MEMORY_PROFILING_ENABLED=False)
+    def test_disabled(self):
+        """Test the endpoint is not found unless enabled"""
+        self.user.is_staff = True
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(MEMORY_PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_snapshots_diffed(self):
+        """Test snapshots report the allocations and instances added since"""
+        self.user.is_staff = True
+        self.client.force_authenticate(self.user)
+
+        first = self.client.post(MEMORY_PROFILE_URL)
+        quotes = [Quote(buyer_first_name=f"Test {i}") for i in range(200)]
+        second = self.client.post(f"{MEMORY_PROFILE_URL}?limit=5").json()
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.json()["growth"], [])
+        self.assertEqual(second["snapshot"], 1)
+        self.assertLessEqual(len(second["top_allocations"]), 5)
+        self.assertTrue(second["growth"])
+        self.assertGreaterEqual(second["objects"]["core.Quote"], len(quotes))
+        self.assertGreaterEqual(second["objects_growth"]["core.Quote"], len(quotes))
+
+    def test_stop(self):
+        """Test stopping the profiler stops tracing"""
+        self.user.is_staff = True
+        self.client.force_authenticate(self.user)
+        self.client.post(MEMORY_PROFILE_URL)
+        self.assertTrue(tracemalloc.is_tracing())
+
+        res = self.client.delete(MEMORY_PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(tracemalloc.is_tracing())
@@ -0,0 +1,126 @@
+"""
+Tests for the request performance metrics
+"""
+from core import metrics
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+METRICS_URL = reverse("metrics")
+QUOTES_URL = reverse("quote:quote-list")
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    """Test recording and rendering metrics"""
+
+    def test_render_histogram(self):
+        """Test histograms are rendered with cumulative buckets"""
+        registry = metrics.MetricsRegistry()
+        registry.histogram("latency_seconds", "Latency", (0.1, 1.0))
+        registry.observe("latency_seconds", 0.05, endpoint="a")
+        registry.observe("latency_seconds", 0.5, endpoint="a")
+        registry.observe("latency_seconds", 5, endpoint="a")
+
+        output = registry.render()
+
+        self.assertIn("# TYPE latency_seconds histogram", output)
+        self.assertIn('latency_seconds_bucket{endpoint="a",le="0.1"} 1', output)
+        self.assertIn('latency_seconds_bucket{endpoint="a",le="1"} 2', output)
+        self.assertIn('latency_seconds_bucket{endpoint="a",le="+Inf"} 3', output)
+        self.assertIn('latency_seconds_sum{endpoint="a"} 5.55', output)
+        self.assertIn('latency_seconds_count{endpoint="a"} 3', output)
+
+    def test_render_counter(self):
+        """Test counters are rendered per label set"""
+        registry = metrics.MetricsRegistry()
+        registry.counter("requests_total", "Requests")
+        registry.increment("requests_total", status="200")
+        registry.increment("requests_total", status="200")
+        registry.increment("requests_total", status="404")
+
+        output = registry.render()
+
+        self.assertIn('requests_total{status="200"} 2', output)
+        self.assertIn('requests_total{status="404"} 1', output)
+
+    def test_timed_outside_request(self):
+        """Test timing a block outside of a measured request is a no-op"""
+        with metrics.timed("pricing"):
+            pass
+
+        with metrics.measure_request() as timings:
+            with metrics.timed("pricing"):
+                pass
+
+        self.assertIn("pricing", timings)
+
+    def test_timed_function(self):
+        """Test a timed function adds its time only within a measured request"""
+
+        @metrics.timed_function("pricing")
+        def price(value):
+            return value * 2
+
+        self.assertEqual(price(2), 4)
+        with metrics.measure_request() as timings:
+            self.assertEqual(price(3), 6)
+
+        self.assertIn("pricing", timings)
+
+
+@override_settings(PERFORMANCE_METRICS_ENABLED=True, PERFORMANCE_SERVER_TIMING=True)
+class MetricsMiddlewareTests(TestCase):
+    """Test the performance metrics middleware"""
+
+    def setUp(self):
+        metrics.REGISTRY.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPassword123"
+        )
+        self.client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_request_metrics_recorded(self):
+        """Test requests are recorded and exposed on the metrics endpoint"""
+        payload = {
+            "buyer_first_name": "Test",
+            "buyer_last_name": "User",
+            "state": "CA",
+            "flat_cost_coverages": {"type_coverage": "Basic", "pet_coverage": True},
+            "percentage_cost_coverages": {"flood_coverage": True},
+        }
+        res = self.client.post(QUOTES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        server_timing = res["Server-Timing"]
+        for phase in ["db;", "auth;", "serializer;", "pricing;", "total;"]:
+            self.assertIn(phase, server_timing)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        output = res.content.decode()
+        labels = 'endpoint="quote:quote-list",method="POST"'
+        self.assertIn(f'http_requests_total{{{labels},status="201"}} 1', output)
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 1", output)
+        self.assertIn(f"http_request_db_queries_count{{{labels}}} 1", output)
+        self.assertIn(
+            f'http_request_phase_duration_seconds_count{{{labels},phase="pricing"}} 1',
+            output,
+        )
+
+    @override_settings(PERFORMANCE_METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        """Test nothing is recorded or exposed when metrics are disabled"""
+        res = self.client.get(QUOTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", res)
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,10 +1,40 @@
 """
 Tests for models
 """
+from decimal import Decimal
+
+from core.models import Quote
+from core.models import QuoteSummary
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
 
 
+def _create_quote(user, **params) -> Quote:
+    """Create and return a sample quote"""
+    defaults = {
+        "buyer_first_name": "Test",
+        "buyer_last_name": "User",
+        "state": "CA",
+        "flat_cost_coverages": {"type_coverage": "Basic", "pet_coverage": False},
+        "percentage_cost_coverages": {"flood_coverage": False},
+        "monthly_total": Decimal("20.20"),
+    }
+    defaults.update(params)
+    return Quote.objects.create(user=user, **defaults)
+
+
+def _partition_index_names(index_name: str) -> list[str]:
+    """Return the names of the partition indexes attached to an index"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = %s::regclass",
+            [index_name],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
 class ModelTest(TestCase):
     """Test models"""
 
@@ -47,3 +77,127 @@ class ModelTest(TestCase):
 
         self.assertTrue(user.is_superuser)
         self.assertTrue(user.is_staff)
+
+    # QuoteSummary Model
+    def test_apply_delta_creates_summary(self):
+        """Test applying a delta for a user without a summary creates one"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+
+        QuoteSummary.objects.apply_delta(
+            user, quote_count=1, monthly_total=Decimal("20.20")
+        )
+
+        summary = QuoteSummary.objects.get(user=user)
+        self.assertEqual(summary.quote_count, 1)
+        self.assertEqual(summary.monthly_total, Decimal("20.20"))
+
+    def test_apply_delta_updates_summary(self):
+        """Test applying deltas accumulates onto the existing summary"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+
+        QuoteSummary.objects.apply_delta(
+            user, quote_count=2, monthly_total=Decimal("60.30")
+        )
+        QuoteSummary.objects.apply_delta(
+            user, quote_count=-1, monthly_total=Decimal("-20.10")
+        )
+
+        summary = QuoteSummary.objects.get(user=user)
+        self.assertEqual(summary.quote_count, 1)
+        self.assertEqual(summary.monthly_total, Decimal("40.20"))
+
+    def test_apply_negative_delta_without_summary(self):
+        """Test removing quotes from a missing summary doesn't create one"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+
+        QuoteSummary.objects.apply_delta(
+            user, quote_count=-1, monthly_total=Decimal("-20.20")
+        )
+
+        self.assertFalse(QuoteSummary.objects.filter(user=user).exists())
+
+    def test_rebuild_summaries(self):
+        """Test rebuilding summaries matches the quotes table"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+        other_user = get_user_model().objects.create_user("other@example.com", "pass")
+        _create_quote(user, monthly_total=Decimal("20.20"))
+        _create_quote(user, monthly_total=Decimal("41.20"))
+        _create_quote(other_user, monthly_total=Decimal("90.45"))
+        QuoteSummary.objects.apply_delta(user, quote_count=7)
+
+        created = QuoteSummary.objects.rebuild(batch_size=1)
+
+        self.assertEqual(created, 2)
+        summary = QuoteSummary.objects.get(user=user)
+        self.assertEqual(summary.quote_count, 2)
+        self.assertEqual(summary.monthly_total, Decimal("61.40"))
+        other_summary = QuoteSummary.objects.get(user=other_user)
+        self.assertEqual(other_summary.quote_count, 1)
+        self.assertEqual(other_summary.monthly_total, Decimal("90.45"))
+
+    # Quote Model
+    def test_quote_filter_indexes(self):
+        """Test the quote list filters are planned against their indexes"""
+        user = get_user_model().objects.create_user("test@example.com", "pass123")
+        for i, state in enumerate(["CA", "TX", "NY"] * 50):
+            _create_quote(
+                user,
+                state=state,
+                buyer_first_name=f"Buyer{i}",
+                buyer_last_name=f"User{i}",
+            )
+        filters = [
+            (
+                Quote.objects.filter(
+                    flat_cost_coverages__contains={"pet_coverage": True}
+                ),
+                "core_quote_flat_cov_gin_idx",
+            ),
+            (
+                Quote.objects.filter(
+                    percentage_cost_coverages__contains={"flood_coverage": True}
+                ),
+                "core_quote_pct_cov_gin_idx",
+            ),
+            (
+                Quote.objects.filter(user=user, buyer_last_name__istartswith="user12"),
+                "core_quote_last_name_prefix_idx",
+            ),
+            (
+                Quote.objects.filter(
+                    user=user, buyer_first_name__istartswith="buyer12"
+                ),
+                "core_quote_first_name_prefix_idx",
+            ),
+        ]
+
+        # The table is too small for the planner to prefer an index on its own
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_quote")
+            cursor.execute("SET enable_seqscan = off")
+        try:
+            for queryset, index_name in filters:
+                plan = queryset.explain()
+                # Scans name the index each partition inherited from index_name
+                partition_indexes = _partition_index_names(index_name)
+                self.assertTrue(any(name in plan for name in partition_indexes), plan)
+
+            # A user's quotes in a state only scan the state's partition, where
+            # the indexes leading with user_id need no state column
+            plan = Quote.objects.in_states("CA").filter(user=user).explain()
+            self.assertIn("on core_quote_ca ", plan)
+            for partition in ["core_quote_tx", "core_quote_ny", "core_quote_default"]:
+                self.assertNotIn(partition, plan)
+            user_indexes = [
+                name
+                for index_name in [
+                    "core_quote_user_id_5b539744",
+                    "core_quote_first_name_prefix_idx",
+                    "core_quote_last_name_prefix_idx",
+                ]
+                for name in _partition_index_names(index_name)
+            ]
+            self.assertTrue(any(name in plan for name in user_indexes), plan)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
@@ -0,0 +1,84 @@
+"""
+Tests for the state partitioning of the quotes table
+"""
+from core.models import Quote
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+STATES = ["CA", "TX", "NY"]
+
+
+def _partition_counts() -> dict[str, int]:
+    """Return the number of rows stored in each quote partition"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text, COUNT(*) FROM core_quote GROUP BY 1"
+        )
+        return dict(cursor.fetchall())
+
+
+class QuotePartitioningTests(TestCase):
+    """Test quotes are partitioned by state"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testPassword123",
+        )
+        for i in range(30):
+            Quote.objects.create(
+                user=self.user,
+                buyer_first_name="Test",
+                buyer_last_name=f"User{i}",
+                state=STATES[i % len(STATES)],
+                flat_cost_coverages={"type_coverage": "Basic", "pet_coverage": False},
+                percentage_cost_coverages={"flood_coverage": False},
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_quote")
+
+    def test_quotes_stored_in_state_partition(self):
+        """Test each quote is stored in the partition for its state"""
+        self.assertEqual(
+            _partition_counts(),
+            {"core_quote_ca": 10, "core_quote_tx": 10, "core_quote_ny": 10},
+        )
+
+    def test_update_state_moves_partition(self):
+        """Test changing a quote's state moves it to the new partition"""
+        quote = Quote.objects.in_states("CA").first()
+        quote.state = "NY"
+        quote.save()
+
+        counts = _partition_counts()
+        self.assertEqual(counts["core_quote_ca"], 9)
+        self.assertEqual(counts["core_quote_ny"], 11)
+        self.assertEqual(Quote.objects.get(id=quote.id).state, "NY")
+
+    def test_state_queries_prune_partitions(self):
+        """Test state scoped queries only scan the partitions for those states"""
+        queries = [
+            (Quote.objects.in_states("CA"), ["core_quote_ca"]),
+            (Quote.objects.in_states("TX", "NY"), ["core_quote_tx", "core_quote_ny"]),
+            (
+                Quote.objects.filter(user=self.user).in_states("NY"),
+                ["core_quote_ny"],
+            ),
+        ]
+
+        for queryset, partitions in queries:
+            plan = queryset.explain()
+            for partition in ["core_quote_ca", "core_quote_tx", "core_quote_ny"]:
+                if partition in partitions:
+                    self.assertIn(partition, plan)
+                else:
+                    self.assertNotIn(partition, plan)
+            self.assertNotIn("core_quote_default", plan)
+
+    def test_unscoped_queries_scan_all_partitions(self):
+        """Test queries without a state have to scan every partition"""
+        plan = Quote.objects.filter(user=self.user).explain()
+
+        for partition in ["core_quote_ca", "core_quote_tx", "core_quote_ny"]:
+            self.assertIn(partition, plan)
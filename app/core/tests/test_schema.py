@@ -0,0 +1,76 @@
+"""
+Tests for the cached OpenAPI schema
+"""
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from core import schema
+from django.test import override_settings
+from django.test import SimpleTestCase
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+
+SCHEMA_URL = reverse("api-schema")
+JSON_MEDIA_TYPE = "application/vnd.oai.openapi+json"
+
+
+class CachedSchemaTests(SimpleTestCase):
+    """Test serving the schema from the cached artifact"""
+
+    def setUp(self):
+        schema.clear_cache()
+        self.addCleanup(schema.clear_cache)
+
+    def test_schema_generated_once(self):
+        """Test the schema is generated on the first request only"""
+        calls = []
+        get_schema = SchemaGenerator.get_schema
+
+        def counted_get_schema(generator, *args, **kwargs):
+            calls.append(args)
+            return get_schema(generator, *args, **kwargs)
+
+        with patch.object(SchemaGenerator, "get_schema", counted_get_schema):
+            first = self.client.get(SCHEMA_URL, HTTP_ACCEPT=JSON_MEDIA_TYPE)
+            second = self.client.get(SCHEMA_URL, HTTP_ACCEPT=JSON_MEDIA_TYPE)
+            yaml = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.content, second.content)
+        self.assertIn("/api/quote/quotes/", json.loads(first.content)["paths"])
+        self.assertTrue(yaml["Content-Type"].startswith("application/vnd.oai.openapi;"))
+        self.assertIn(b"openapi: 3.0.3", yaml.content)
+
+    def test_schema_not_modified(self):
+        """Test a request with the current ETag gets a 304 without a body"""
+        res = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_schema_gzipped(self):
+        """Test clients accepting gzip get the compressed artifact"""
+        res = self.client.get(SCHEMA_URL)
+        compressed = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), res.content)
+        self.assertEqual(compressed["ETag"], res["ETag"])
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+
+    def test_schema_from_file(self):
+        """Test serving the schema built into OPENAPI_SCHEMA_FILE"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_file = Path(tmp_dir) / "schema.json"
+            schema_file.write_text(
+                json.dumps({"openapi": "3.0.3", "info": {"title": "Built"}})
+            )
+            with override_settings(OPENAPI_SCHEMA_FILE=str(schema_file)):
+                res = self.client.get(SCHEMA_URL, HTTP_ACCEPT=JSON_MEDIA_TYPE)
+
+        self.assertEqual(json.loads(res.content)["info"], {"title": "Built"})
@@ -0,0 +1,149 @@
+"""
+Tests for the token bucket throttles
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from core.throttling import IPRateThrottle
+from core.throttling import TokenBucketThrottle
+from core.throttling import TokenRateThrottle
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+QUOTES_URL = reverse("quote:quote-list")
+
+
+class _Clock:
+    """Controllable replacement for the throttle's timer"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketThrottleTests(SimpleTestCase):
+    """Test the token bucket algorithm"""
+
+    def setUp(self):
+        cache.clear()
+        self.clock = _Clock()
+        self.request = RequestFactory().get("/")
+
+    def _throttle(self) -> TokenBucketThrottle:
+        throttle = IPRateThrottle()
+        throttle.timer = self.clock
+        return throttle
+
+    @patch.object(IPRateThrottle, "rate", "3/min", create=True)
+    def test_burst_then_refill(self):
+        """Test a full bucket allows a burst, then refills at the average rate"""
+        allowed = [self._throttle().allow_request(self.request, None) for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+
+        throttle = self._throttle()
+        throttle.allow_request(self.request, None)
+        self.assertAlmostEqual(throttle.wait(), 20)
+
+        self.clock.now += 20
+        self.assertTrue(self._throttle().allow_request(self.request, None))
+        self.assertFalse(self._throttle().allow_request(self.request, None))
+
+        self.clock.now += 600
+        allowed = [self._throttle().allow_request(self.request, None) for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+
+    @patch.object(IPRateThrottle, "rate", "1/min", create=True)
+    def test_separate_buckets_per_ip(self):
+        """Test each client address has its own bucket"""
+        other_request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.2")
+
+        self.assertTrue(self._throttle().allow_request(self.request, None))
+        self.assertTrue(self._throttle().allow_request(other_request, None))
+        self.assertFalse(self._throttle().allow_request(self.request, None))
+
+    @patch.object(IPRateThrottle, "rate", "5/min", create=True)
+    def test_concurrent_requests(self):
+        """Test concurrent requests each take their own token from the bucket"""
+        barrier = threading.Barrier(20)
+        allowed = []
+
+        def request():
+            throttle = self._throttle()
+            barrier.wait()
+            allowed.append(throttle.allow_request(self.request, None))
+
+        def slow_set(self, *args, **kwargs):
+            # Let the other requests read the bucket before it's written
+            time.sleep(0.01)
+            return set_(self, *args, **kwargs)
+
+        # Patched on the class, each thread has its own cache connection
+        set_ = LocMemCache.set
+        with patch.object(LocMemCache, "set", slow_set):
+            threads = [threading.Thread(target=request) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(allowed.count(True), 5)
+
+
+@patch.object(TokenRateThrottle, "THROTTLE_RATES", {"token": "2/min", "ip": "1000/min"})
+class ThrottledAPITests(TestCase):
+    """Test the throttles applied to the API"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPassword123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_token_throttled(self):
+        """Test a user over their rate gets a 429 with Retry-After"""
+        for _ in range(2):
+            res = self.client.get(QUOTES_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(QUOTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "30")
+
+    def test_users_throttled_separately(self):
+        """Test another user from the same address has their own limit"""
+        for _ in range(3):
+            self.client.get(QUOTES_URL)
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testPassword123"
+        )
+        self.client.force_authenticate(other_user)
+
+        res = self.client.get(QUOTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_tokens_throttled_separately(self):
+        """Test each of a user's tokens has its own limit"""
+        for key in ("a" * 40, "b" * 40):
+            self.client.force_authenticate(self.user, Token(key=key, user=self.user))
+            for _ in range(2):
+                res = self.client.get(QUOTES_URL)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(QUOTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,96 @@
+"""
+Token bucket throttles for the API
+
+A bucket holds up to the rate's number of requests and refills continuously
+over its period, so clients may burst up to the limit and then sustain the
+average rate. The bucket is stored as the time it will be full again, a single
+integer cache entry that each request advances with an atomic `incr`, so
+concurrent requests can't overwrite each other's updates. It never queries
+Postgres. Configure a shared cache (CACHE_HOSTS) to enforce the limits across
+processes.
+"""
+import hashlib
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+
+# Bucket times are kept in integer microseconds so the cache can incr them
+MICROSECONDS = 1_000_000
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Throttle requests with a token bucket stored in the cache
+
+    Subclasses set the `scope` used to look up the rate and implement
+    `get_cache_key()`.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = int(self.timer() * MICROSECONDS)
+        period = self.duration * MICROSECONDS
+        interval = max(1, period // self.num_requests)
+        # Taking a token moves the time the bucket is full again one interval
+        # later, a missing entry is a full bucket
+        try:
+            full_at = self.cache.incr(self.key, interval)
+        except ValueError:
+            full_at = now + interval
+            if not self.cache.add(self.key, full_at, self.duration):
+                # Another request added it first
+                full_at = self.cache.incr(self.key, interval)
+        if full_at < now + interval:
+            # The entry outlived the refill by the cache's expiry precision,
+            # catch up to a full bucket
+            full_at = self.cache.incr(self.key, now + interval - full_at)
+
+        if full_at - now > period:
+            # Give the token back, the request isn't made
+            self.cache.decr(self.key, interval)
+            self.wait_time = (full_at - now - period) / MICROSECONDS
+            return False
+
+        # A bucket left alone until it's full again can expire then
+        self.cache.touch(self.key, math.ceil((full_at - now) / MICROSECONDS))
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class TokenRateThrottle(TokenBucketThrottle):
+    """Limit the requests made with each auth token
+
+    The token is hashed so the cache never holds a credential. Requests
+    authenticated without a token, e.g. by a session, share a bucket per user.
+    """
+
+    scope = "token"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        key = getattr(request.auth, "key", None)
+        if key is None:
+            ident = f"user-{request.user.pk}"
+        else:
+            ident = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """Limit the requests made from each client IP address"""
+
+    scope = "ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
@@ -0,0 +1,64 @@
+"""
+Views for operating the application
+"""
+from core import metrics
+from core.authentication import TokenAuthentication
+from core.memory import PROFILER
+from django.conf import settings
+from django.http import Http404
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+def metrics_view(request):
+    """Expose the request performance metrics for Prometheus to scrape"""
+    if not settings.PERFORMANCE_METRICS_ENABLED:
+        raise Http404()
+
+    return HttpResponse(
+        metrics.REGISTRY.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class MemoryProfileParamsSerializer(serializers.Serializer):
+    """Serializer for the query parameters of the memory profile"""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    since_start = serializers.BooleanField(default=False)
+    frames = serializers.IntegerField(min_value=1, max_value=50, default=1)
+
+
+@extend_schema(exclude=True)
+class MemoryProfileView(APIView):
+    """Profile the memory of the worker serving the request, for staff
+
+    POST takes a tracemalloc snapshot, starting tracing on the first one, and
+    reports the top allocation sites, the model instances alive and how both
+    grew. DELETE stops tracing.
+    """
+
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    renderer_classes = [JSONRenderer]
+
+    def initial(self, request, *args, **kwargs):
+        if not settings.MEMORY_PROFILING_ENABLED:
+            raise Http404()
+        super().initial(request, *args, **kwargs)
+
+    def post(self, request):
+        params = MemoryProfileParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(PROFILER.snapshot(**params.validated_data))
+
+    def delete(self, request):
+        PROFILER.stop()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for running the API in production
+
+Every setting can be overridden with a GUNICORN_* environment variable, see
+the README for how the defaults were chosen.
+"""
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get("GUNICORN_APP", "app.wsgi:application")
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Requests are mostly CPU bound (serialization & pricing) against a local
+# Postgres, so processes scale better than threads under the GIL. Raise
+# GUNICORN_THREADS when the database is remote and requests wait on the network
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync"
+)
+
+# Import Django and the apps once in the master so workers share the memory
+# through copy-on-write and start serving as soon as they are forked
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true") == "true"
+
+# Recycle workers periodically to bound memory growth, the jitter stops all
+# workers restarting at the same time
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# Time given to in-flight requests when workers are stopped or reloaded (HUP)
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Drop any database connection opened while preloading in the master
+
+    A connection shared between forked workers would interleave their queries.
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,198 @@
+"""
+Benchmarks for the Quote API hot paths, run with `manage.py benchmark`
+"""
+import json
+from decimal import Decimal
+
+from core import middleware
+from core import renderers
+from core.benchmarking import benchmark
+from core.models import Quote
+from core.models import QuotePriceHistory
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.text import compress_string
+from quote.constants import RATE_VERSION
+from quote.serializers import QUOTE_DETAIL_FIELDS
+from quote.serializers import QuoteDetailSerializer
+from quote.utils import calculate_quote_cost
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+SEEDED_QUOTES = 100
+# Number of quotes in the list pages encoded by the payload benchmarks
+PAYLOAD_SIZES = (10, 100, 1000)
+
+FLAT_COST_COVERAGES = {"type_coverage": "Premium", "pet_coverage": True}
+PERCENTAGE_COST_COVERAGES = {"flood_coverage": True}
+
+
+def _quote(**params) -> Quote:
+    """Return an unsaved sample quote"""
+    defaults = {
+        "buyer_first_name": "Test",
+        "buyer_last_name": "User",
+        "state": "NY",
+        "flat_cost_coverages": FLAT_COST_COVERAGES,
+        "percentage_cost_coverages": PERCENTAGE_COST_COVERAGES,
+        "monthly_subtotal": Decimal("66.00"),
+        "monthly_taxes": Decimal("1.32"),
+        "monthly_total": Decimal("67.32"),
+    }
+    defaults.update(params)
+    return Quote(**defaults)
+
+
+def _seeded_client() -> tuple[APIClient, Quote]:
+    """Return a client for a user with seeded quotes and one of the quotes"""
+    user = get_user_model().objects.create_user(
+        email=f"benchmark{get_user_model().objects.count()}@example.com",
+        password="testPassword123",
+    )
+    Quote.objects.bulk_create(_quote(user=user) for _ in range(SEEDED_QUOTES))
+    client = APIClient()
+    client.force_authenticate(user)
+    return client, Quote.objects.filter(user=user).first()
+
+
+@benchmark("pricing.calculate_quote_cost")
+def bench_calculate_quote_cost():
+    return lambda: calculate_quote_cost(
+        "NY", FLAT_COST_COVERAGES, PERCENTAGE_COST_COVERAGES
+    )
+
+
+@benchmark("fields.data_class_field.decode")
+def bench_data_class_field_decode():
+    field = Quote._meta.get_field("flat_cost_coverages")
+    value = json.dumps(FLAT_COST_COVERAGES)
+    return lambda: field.from_db_value(value, None, None)
+
+
+@benchmark("fields.data_class_field.encode")
+def bench_data_class_field_encode():
+    field = Quote._meta.get_field("flat_cost_coverages")
+    return lambda: field.get_prep_value(FLAT_COST_COVERAGES)
+
+
+@benchmark("serializers.quote_detail.render_one")
+def bench_quote_detail_serializer_render_one():
+    quote = _quote(id=1)
+    return lambda: QuoteDetailSerializer(quote).data
+
+
+@benchmark(f"serializers.quote_detail.render_{SEEDED_QUOTES}")
+def bench_quote_detail_serializer_render_many():
+    quotes = [_quote(id=i) for i in range(SEEDED_QUOTES)]
+    return lambda: QuoteDetailSerializer(quotes, many=True).data
+
+
+def _list_page(size: int) -> list:
+    """Return the serialized data of a quote list page with varied quotes"""
+    states = ["CA", "TX", "NY"]
+    quotes = [
+        _quote(
+            id=i,
+            buyer_first_name=f"Buyer{i}",
+            buyer_last_name=f"Surname{i * 7919 % 1000}",
+            state=states[i % len(states)],
+            flat_cost_coverages={
+                "type_coverage": "Premium" if i % 2 else "Basic",
+                "pet_coverage": i % 3 == 0,
+            },
+            percentage_cost_coverages={"flood_coverage": i % 5 == 0},
+            monthly_total=Decimal(40 + i % 97) + Decimal(i % 100) / 100,
+        )
+        for i in range(size)
+    ]
+    return QuoteDetailSerializer(quotes, many=True).data
+
+
+def _register_payload_benchmarks() -> None:
+    """Register the payload benchmarks of each page size"""
+    for size in PAYLOAD_SIZES:
+
+        @benchmark(f"payload.json.render_{size}")
+        def bench_json_render(size=size):
+            data = _list_page(size)
+            return lambda: JSONRenderer().render(data)
+
+        @benchmark(f"payload.gzip.compress_{size}")
+        def bench_gzip_compress(size=size):
+            content = JSONRenderer().render(_list_page(size))
+            return lambda: compress_string(content)
+
+        if renderers.OPTIONAL_RENDERERS:
+
+            @benchmark(f"payload.msgpack.render_{size}")
+            def bench_msgpack_render(size=size):
+                data = _list_page(size)
+                return lambda: renderers.MessagePackRenderer().render(data)
+
+        if middleware.brotli:
+
+            @benchmark(f"payload.brotli.compress_{size}")
+            def bench_brotli_compress(size=size):
+                content = JSONRenderer().render(_list_page(size))
+                return lambda: middleware.brotli.compress(
+                    content, quality=middleware.CompressionMiddleware.brotli_quality
+                )
+
+
+_register_payload_benchmarks()
+
+
+@benchmark("api.quote.create", database=True)
+def bench_api_create_quote():
+    client, _ = _seeded_client()
+    url = reverse("quote:quote-list")
+    payload = {
+        "buyer_first_name": "Test",
+        "buyer_last_name": "User",
+        "state": "NY",
+        "flat_cost_coverages": FLAT_COST_COVERAGES,
+        "percentage_cost_coverages": PERCENTAGE_COST_COVERAGES,
+    }
+    return lambda: client.post(url, payload, format="json")
+
+
+@benchmark(f"api.quote.list_{SEEDED_QUOTES}", database=True)
+def bench_api_list_quotes():
+    client, _ = _seeded_client()
+    url = reverse("quote:quote-list")
+    return lambda: client.get(url)
+
+
+@benchmark(f"api.quote.list_{SEEDED_QUOTES}_all_fields", database=True)
+def bench_api_list_quotes_all_fields():
+    client, _ = _seeded_client()
+    url = reverse("quote:quote-list")
+    fields = ",".join(QUOTE_DETAIL_FIELDS)
+    return lambda: client.get(url, {"fields": fields})
+
+
+@benchmark(f"api.quote.list_{SEEDED_QUOTES}_sparse", database=True)
+def bench_api_list_quotes_sparse():
+    client, _ = _seeded_client()
+    url = reverse("quote:quote-list")
+    return lambda: client.get(url, {"fields": "id,monthly_total"})
+
+
+@benchmark("api.quote.retrieve", database=True)
+def bench_api_retrieve_quote():
+    client, quote = _seeded_client()
+    url = reverse("quote:quote-detail", args=[quote.id])
+    return lambda: client.get(url)
+
+
+@benchmark("api.quote.price_matrix", database=True)
+def bench_api_price_matrix():
+    client, _ = _seeded_client()
+    url = reverse("quote:quote-price-matrix")
+    return lambda: client.get(url)
+
+
+@benchmark("history.record_1000", database=True)
+def bench_price_history_record():
+    quotes = [_quote(id=i) for i in range(1000)]
+    return lambda: QuotePriceHistory.objects.record(quotes, RATE_VERSION)
@@ -7,6 +7,9 @@ from dataclasses import dataclass
 
 from django.db import models as m
 from django.utils.translation import gettext_lazy as _
+from quote.coverages import CoverageRegistry
+from quote.coverages import Flat
+from quote.coverages import Percentage
 
 
 class DataClassField(m.JSONField):
@@ -56,39 +59,35 @@ class QuoteCoverageTypesCost:
     Premium: int
 
 
-@dataclass
-class QuoteFlatCostCoverages:
-    """Dataclass to store flat cost coverages"""
-
-    """
-        Rules for adding a flat cost coverage:
-        - Use naming convention:
-            <attribute name>_coverage
-        - Use a TextChoice and dataclass when the coverage requires
-          multiple options
-    """
-    type_coverage: QuoteCoverageTypes
-    pet_coverage: bool
-
-    def to_json(self) -> str:
-        return json.dumps(self, default=lambda o: o.__dict__)
-
-
-@dataclass
-class QuotePercentageCostCoverages:
-    """Dataclass to store percentage cost coverages"""
-
-    """
-        Rules for adding a flat cost coverage:
-        - Use naming convention:
-            <attribute name>_coverage
-        - Use a TextChoice and dataclass when the coverage requires
-          multiple options
-    """
-    flood_coverage: bool
-
-    def to_json(self) -> str:
-        return json.dumps(self, default=lambda o: o.__dict__)
+# Coverages offered on quotes, each declared once with the rule pricing it, see
+# quote/coverages.py. Additive rules (Flat, PerUnit, Tiered) are flat cost
+# coverages, multiplicative ones (Percentage, Capped) percentage cost coverages.
+# Rules for adding a coverage:
+# - Use naming convention:
+#     <attribute name>_coverage
+# - Pass a TextChoice as `choices` when the coverage requires multiple options
+# - Add its cost to StateSpecificCosts
+COVERAGES = CoverageRegistry()
+COVERAGES.register(
+    Flat(
+        "type_coverage",
+        choices=QuoteCoverageTypes,
+        default="Basic",
+        help_text="The type of coverage",
+    )
+)
+COVERAGES.register(Flat("pet_coverage", help_text="Optional coverage for pets"))
+COVERAGES.register(
+    Percentage("flood_coverage", help_text="Optional coverage for floods")
+)
+
+# Dataclasses to store the flat and percentage cost coverages
+QuoteFlatCostCoverages = COVERAGES.dataclass(
+    "QuoteFlatCostCoverages", additive=True, module=__name__
+)
+QuotePercentageCostCoverages = COVERAGES.dataclass(
+    "QuotePercentageCostCoverages", additive=False, module=__name__
+)
 
 
 class States(m.TextChoices):
@@ -100,6 +99,8 @@ class States(m.TextChoices):
             <FSNV> = <2 letter state code>, _("<full state name>")
         - NOTE: FSNV stands for Full State Name as a Variable
         - NOTE: The variable should replace all spaces with `_`
+        - Add a partition for the state to the core_quote table in a
+          migration, see core/migrations/0006_partition_quote_by_state.py
     """
 
     California = "CA", _("California")
@@ -117,6 +118,8 @@ class StateSpecificCosts:
             <attribute_name>_cost: int
         - QuotePercentageCostCoverages will have a naming convention of:
             <attribute_name>_percentage_cost: float
+        - A coverage registered in COVERAGES with another cost attribute
+          uses that name instead
     """
     type_coverage_cost: QuoteCoverageTypesCost
     pet_coverage_cost: int
@@ -166,6 +169,10 @@ class NewYorkCost(StateSpecificCosts):
         self.tax_rate = 2
 
 
+# Version of the rates below, bump it whenever they change so the cached price
+# matrix (see quote.utils.price_matrix) is recomputed
+RATE_VERSION = "1"
+
 # Extend this mapping when adding a new state
 STATE_MAPPING_COSTS: dict[str, t.Any] = {
     States.California: CaliforniaCost(),  # type: ignore
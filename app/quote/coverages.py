@@ -0,0 +1,299 @@
+"""
+Coverage types and their pricing rules
+
+Each coverage is declared once, in quote.constants.COVERAGES, with the rule
+pricing it. The registry builds the coverage dataclasses stored on quotes and
+the serializer fields validating them, and compiles the rules of every coverage
+for a state's costs into one straight-line function, with the state's costs
+inlined as integer cents and basis points. Pricing a quote then costs a dict
+lookup and a couple of integer operations per coverage, without reflecting on
+the costs' attribute names.
+
+Additive coverages (flat, per-unit, tiered) are read from the quote's flat
+cost coverages and summed first. Multiplicative coverages (percentage, capped)
+are read from its percentage cost coverages and applied to that subtotal in
+registration order.
+"""
+import abc
+import dataclasses
+import json
+import typing as t
+from decimal import Decimal
+
+from django.db import models as m
+from rest_framework import serializers
+
+# Prices are computed in integer cents and percentages in basis points, so
+# 100% is BASIS_POINTS
+BASIS_POINTS = 10_000
+
+# Compiled pricing function, taking the flat and percentage cost coverages and
+# returning the monthly subtotal, taxes and total in cents
+PricingFunction = t.Callable[[dict[str, t.Any], dict[str, t.Any]], tuple[int, int, int]]
+
+
+def to_hundredths(value: float) -> int:
+    """Convert a cost in dollars to cents, or a percentage to basis points
+
+    Refuses a value with more than two decimal places rather than rounding it,
+    the value's shortest repr is taken as the exact decimal it stands for.
+    """
+    hundredths = Decimal(str(value)).scaleb(2)
+    if hundredths != hundredths.to_integral_value():
+        raise ValueError(f"{value} has more than two decimal places")
+    return int(hundredths)
+
+
+class Coverage(abc.ABC):
+    """Pricing rule of a coverage type
+
+    `cost` names the attribute of the state costs holding the coverage's cost,
+    a state without it can't price the coverage. `help_text` documents the
+    coverage's field in the API.
+    """
+
+    additive = True
+    cost_suffix = "_cost"
+    # Type of the coverage's value in the coverages dataclass
+    annotation: t.Any = bool
+
+    def __init__(self, name: str, cost: str | None = None, help_text: str = ""):
+        if not name.isidentifier():
+            raise ValueError(f"Invalid coverage name: {name}")
+        self.name = name
+        self.cost = cost or f"{name}{self.cost_suffix}"
+        self.help_text = help_text
+
+    def serializer_field(self) -> serializers.Field:
+        """Return the field validating the coverage's value"""
+        return serializers.BooleanField(default=False, help_text=self.help_text)
+
+    @abc.abstractmethod
+    def emit(self, costs: t.Any, constant: t.Callable[[t.Any], str]) -> list[str]:
+        """Return the lines pricing the coverage's `value` for the state costs
+
+        The lines add to `subtotal` cents, or multiply the exact subtotal of
+        `subtotal / scale` cents. `constant` returns the name the generated
+        code can refer to a value by.
+        """
+
+
+class OptionsCoverage(Coverage):
+    """A coverage taken or not, or with one of the `choices` options
+
+    With choices the state's cost maps each option to its cost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cost: str | None = None,
+        help_text: str = "",
+        choices: type[m.TextChoices] | None = None,
+        default: str | None = None,
+    ):
+        super().__init__(name, cost, help_text)
+        self.choices = choices
+        self.default = default
+        if choices is not None:
+            self.annotation = choices
+
+    def serializer_field(self):
+        if self.choices is None:
+            return super().serializer_field()
+        return serializers.ChoiceField(
+            choices=self.choices.choices,
+            default=self.default,
+            help_text=self.help_text,
+        )
+
+
+class Flat(OptionsCoverage):
+    """A fixed cost when the coverage is True, or the cost of the chosen option"""
+
+    def emit(self, costs, constant):
+        cost = getattr(costs, self.cost)
+        if isinstance(cost, (int, float)):
+            return ["if value is True:", f"    subtotal += {to_hundredths(cost)}"]
+        options = {k: to_hundredths(v) for k, v in vars(cost).items()}
+        return ["if type(value) is str:", f"    subtotal += {constant(options)}[value]"]
+
+
+class PerUnit(Coverage):
+    """A cost for each unit covered, e.g. per pet"""
+
+    annotation = int
+
+    def serializer_field(self):
+        return serializers.IntegerField(
+            min_value=0, default=0, help_text=self.help_text
+        )
+
+    def emit(self, costs, constant):
+        cents = to_hundredths(getattr(costs, self.cost))
+        return ["if type(value) is int:", f"    subtotal += value * {cents}"]
+
+
+class Tiered(PerUnit):
+    """The cost of the tier the number of units covered falls in
+
+    The cost is a sequence of (up to, cost) tiers in ascending order, the last
+    tier's bound may be None to cover any number of units.
+    """
+
+    def emit(self, costs, constant):
+        tiers = list(getattr(costs, self.cost))
+        if not tiers:
+            raise ValueError(f"The {self.cost} cost of {self.name} has no tiers")
+        if any(up_to is None for up_to, _ in tiers[:-1]):
+            raise ValueError(f"Only the last {self.cost} tier may be unbounded")
+
+        lines = ["if type(value) is int:"]
+        for index, (up_to, cost) in enumerate(tiers):
+            if up_to is not None:
+                keyword = "elif" if index else "if"
+                lines.append(f"    {keyword} value <= {int(up_to)}:")
+            elif index:
+                lines.append("    else:")
+            else:
+                lines.append("    if True:")
+            lines.append(f"        subtotal += {to_hundredths(cost)}")
+        if tiers[-1][0] is not None:
+            message = constant(f"{self.name} has no tier for this many units")
+            lines += ["    else:", f"        raise ValueError({message})"]
+        return lines
+
+
+class Percentage(OptionsCoverage):
+    """A percentage of the subtotal when the coverage is True, or of the option"""
+
+    additive = False
+    cost_suffix = "_percentage_cost"
+
+    def emit(self, costs, constant):
+        cost = getattr(costs, self.cost)
+        if isinstance(cost, (int, float)):
+            condition = "value is True"
+            factor = str(BASIS_POINTS + to_hundredths(cost))
+        else:
+            options = {
+                k: BASIS_POINTS + to_hundredths(v) for k, v in vars(cost).items()
+            }
+            condition = "type(value) is str"
+            factor = f"{constant(options)}[value]"
+        return [
+            f"if {condition}:",
+            f"    subtotal *= {factor}",
+            f"    scale *= {BASIS_POINTS}",
+        ]
+
+
+class Capped(Coverage):
+    """A percentage of the subtotal when the coverage is True, up to a maximum
+
+    `cap` names the attribute of the state costs holding the maximum cost.
+    """
+
+    additive = False
+    cost_suffix = "_percentage_cost"
+
+    def __init__(
+        self,
+        name: str,
+        cost: str | None = None,
+        help_text: str = "",
+        cap: str | None = None,
+    ):
+        super().__init__(name, cost, help_text)
+        self.cap = cap or f"{name}_cap"
+
+    def emit(self, costs, constant):
+        basis_points = to_hundredths(getattr(costs, self.cost))
+        cap = to_hundredths(getattr(costs, self.cap)) * BASIS_POINTS
+        return [
+            "if value is True:",
+            f"    subtotal = subtotal * {BASIS_POINTS} + min(",
+            f"        subtotal * {basis_points}, {cap} * scale",
+            "    )",
+            f"    scale *= {BASIS_POINTS}",
+        ]
+
+
+def _to_json(self) -> str:
+    return json.dumps(self, default=lambda o: o.__dict__)
+
+
+class CoverageRegistry:
+    """Coverage types offered on quotes"""
+
+    def __init__(self):
+        self._coverages: dict[str, Coverage] = {}
+
+    def register(self, coverage: Coverage) -> Coverage:
+        """Add a coverage type, priced in the order it was registered"""
+        if coverage.name in self._coverages:
+            raise ValueError(f"Coverage {coverage.name} is already registered")
+        self._coverages[coverage.name] = coverage
+        return coverage
+
+    def coverages(self, additive: bool) -> list[Coverage]:
+        """Return the additive or the multiplicative coverages"""
+        return [c for c in self._coverages.values() if c.additive is additive]
+
+    def dataclass(self, name: str, additive: bool, module: str) -> type:
+        """Return a dataclass with a field per additive or multiplicative coverage"""
+        return dataclasses.make_dataclass(
+            name,
+            [(c.name, c.annotation) for c in self.coverages(additive)],
+            namespace={"to_json": _to_json, "__module__": module},
+        )
+
+    def serializer_fields(self, additive: bool) -> dict[str, serializers.Field]:
+        """Return the fields validating the additive or multiplicative coverages"""
+        return {c.name: c.serializer_field() for c in self.coverages(additive)}
+
+    def compile(self, state: str, costs: t.Any) -> PricingFunction:
+        """Return the function pricing the registered coverages at the costs
+
+        The percentage coverages compound on the exact subtotal, which is only
+        rounded half up to the cent at the end. Taxes are rounded down to the
+        cent, and the total is the sum of the rounded subtotal and taxes.
+        """
+        namespace: dict[str, t.Any] = {}
+
+        def constant(value: t.Any) -> str:
+            name = f"_c{len(namespace)}"
+            namespace[name] = value
+            return name
+
+        lines = ["def price(flat, percentage):", "    subtotal = 0", "    scale = 1"]
+        for coverage in self.coverages(True) + self.coverages(False):
+            source = "flat" if coverage.additive else "percentage"
+            lines.append(f"    value = {source}.get({coverage.name!r})")
+            if hasattr(costs, coverage.cost):
+                try:
+                    body = coverage.emit(costs, constant)
+                except ValueError as exc:
+                    raise ValueError(
+                        f"Can't price {coverage.name} in {state}: {exc}"
+                    ) from exc
+            else:
+                message = constant(
+                    f"There is no {coverage.name} cost specified for: {state}"
+                )
+                body = ["if value:", f"    raise ValueError({message})"]
+            lines += [f"    {line}" for line in body]
+
+        try:
+            tax_basis_points = to_hundredths(costs.tax_rate)
+        except ValueError as exc:
+            raise ValueError(f"Can't tax {state}: {exc}") from exc
+        lines += [
+            f"    taxes = subtotal * {tax_basis_points} // (scale * {BASIS_POINTS})",
+            "    subtotal = (2 * subtotal + scale) // (2 * scale)",
+            "    return subtotal, taxes, subtotal + taxes",
+        ]
+
+        code = compile("\n".join(lines), f"<pricing for {state}>", "exec")
+        exec(code, namespace)
+        return namespace["price"]
@@ -1,39 +1,64 @@
 """
 Serializers for the Quote API View
 """
+import typing as t
+
+from core.metrics import TimedListSerializer
+from core.metrics import TimedSerializerMixin
 from core.models import Quote
+from core.models import QuoteEvent
+from core.models import QuoteSummary
+from django.conf import settings
+from quote.constants import COVERAGES
+from quote.constants import QuoteCoverageTypes
+from quote.constants import States
 from rest_framework import serializers
 
+QUOTE_FIELDS: tuple[str, ...] = (
+    "id",
+    "buyer_first_name",
+    "buyer_last_name",
+)
+QUOTE_DETAIL_FIELDS: tuple[str, ...] = QUOTE_FIELDS + (
+    "state",
+    "flat_cost_coverages",
+    "percentage_cost_coverages",
+    "monthly_subtotal",
+    "monthly_taxes",
+    "monthly_total",
+)
+
 
 class FlatCostCoveragesSerializer(serializers.Serializer):
-    type_coverage = serializers.ChoiceField(
-        choices=["Basic", "Premium"],
-        default="Basic",
-        help_text="The type of coverage",
-    )
-    pet_coverage = serializers.BooleanField(
-        default=False,
-        help_text="Optional coverage for pets",
-    )
+    """Flat cost coverages, each adding its cost to the subtotal"""
+
+    def get_fields(self):
+        return COVERAGES.serializer_fields(additive=True)
 
 
 class PercentageCostCoveragesSerializer(serializers.Serializer):
-    flood_coverage = serializers.BooleanField(
-        default=False,
-        help_text="Optional coverage for floods",
-    )
+    """Percentage cost coverages, each adding a percentage of the subtotal"""
+
+    def get_fields(self):
+        return COVERAGES.serializer_fields(additive=False)
+
+
+class QuoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for quotes
 
+    Pass `fields` to only include those of the serializer's fields.
+    """
 
-class QuoteSerializer(serializers.ModelSerializer):
-    """Serializer for quotes"""
+    def __init__(self, *args, fields: t.Iterable[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     class Meta:
         model = Quote
-        fields = (
-            "id",
-            "buyer_first_name",
-            "buyer_last_name",
-        )
+        list_serializer_class = TimedListSerializer
+        fields = QUOTE_FIELDS
         read_only_fields = ["id"]
 
 
@@ -46,16 +71,146 @@ class QuoteDetailSerializer(QuoteSerializer):
     )
 
     class Meta(QuoteSerializer.Meta):
-        fields = QuoteSerializer.Meta.fields + (  # type: ignore
-            "state",
-            "flat_cost_coverages",
-            "percentage_cost_coverages",
-            "monthly_subtotal",
-            "monthly_taxes",
-            "monthly_total",
-        )
+        fields = QUOTE_DETAIL_FIELDS
         read_only_fields = [
             "monthly_subtotal",
             "monthly_taxes",
             "monthly_total",
         ]
+
+
+class QuoteSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a user's quote summary"""
+
+    class Meta:
+        model = QuoteSummary
+        fields = ("quote_count", "monthly_total")
+        read_only_fields = fields
+
+
+class QuoteEventSerializer(serializers.ModelSerializer):
+    """Serializer for quote events"""
+
+    class Meta:
+        model = QuoteEvent
+        fields = ("id", "quote_id", "event_type", "payload", "created_at")
+        read_only_fields = fields
+
+
+class QuoteEventFeedSerializer(serializers.Serializer):
+    """Serializer for a page of the quote change feed"""
+
+    events = QuoteEventSerializer(many=True)
+    last_id = serializers.IntegerField(
+        help_text="Id of the last event, pass it as `after` to get the next page"
+    )
+
+
+class QuoteEventFeedParamsSerializer(serializers.Serializer):
+    """Serializer for the query parameters of the quote change feed"""
+
+    after = serializers.IntegerField(
+        min_value=0,
+        default=0,
+        help_text="Only include the events after this id",
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=1000,
+        default=100,
+        help_text="Maximum number of events to return",
+    )
+    wait = serializers.FloatField(
+        min_value=0,
+        max_value=settings.QUOTE_EVENTS_MAX_WAIT_SECONDS,
+        default=0,
+        help_text="Seconds to wait for an event when there are none yet",
+    )
+
+
+class QuotePriceSerializer(serializers.Serializer):
+    """Serializer for the price of a coverage combination"""
+
+    type_coverage = serializers.ChoiceField(choices=QuoteCoverageTypes.choices)
+    pet_coverage = serializers.BooleanField()
+    flood_coverage = serializers.BooleanField()
+    monthly_subtotal = serializers.DecimalField(max_digits=7, decimal_places=2)
+    monthly_taxes = serializers.DecimalField(max_digits=7, decimal_places=2)
+    monthly_total = serializers.DecimalField(max_digits=7, decimal_places=2)
+
+
+class PriceMatrixSerializer(serializers.Serializer):
+    """Serializer for the prices of every coverage combination per state"""
+
+    rate_version = serializers.CharField(help_text="Version of the rates used")
+    prices = serializers.DictField(
+        child=QuotePriceSerializer(many=True),
+        help_text="Prices of every coverage combination keyed by state",
+    )
+
+
+class PriceMatrixParamsSerializer(serializers.Serializer):
+    """Serializer for the query parameters of the price matrix"""
+
+    state = serializers.MultipleChoiceField(
+        choices=States.choices,
+        required=False,
+        help_text="Only include these states, defaults to every state",
+    )
+
+
+class QuoteFilterSerializer(serializers.Serializer):
+    """Serializer for the query parameters filtering the quote list"""
+
+    state = serializers.MultipleChoiceField(
+        choices=States.choices,
+        required=False,
+        help_text="Only include quotes for these states",
+    )
+    type_coverage = serializers.ChoiceField(
+        choices=QuoteCoverageTypes.choices,
+        required=False,
+        help_text="Only include quotes with this type of coverage",
+    )
+    pet_coverage = serializers.BooleanField(
+        default=None,
+        allow_null=True,
+        help_text="Only include quotes with or without pet coverage",
+    )
+    flood_coverage = serializers.BooleanField(
+        default=None,
+        allow_null=True,
+        help_text="Only include quotes with or without flood coverage",
+    )
+    monthly_total_min = serializers.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        required=False,
+        help_text="Only include quotes with a monthly total of at least this amount",
+    )
+    monthly_total_max = serializers.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        required=False,
+        help_text="Only include quotes with a monthly total of at most this amount",
+    )
+    buyer_first_name = serializers.CharField(
+        max_length=255,
+        required=False,
+        help_text="Only include quotes where the buyer's first name starts with this",
+    )
+    buyer_last_name = serializers.CharField(
+        max_length=255,
+        required=False,
+        help_text="Only include quotes where the buyer's last name starts with this",
+    )
+
+    def validate(self, attrs: dict[str, t.Any]) -> dict[str, t.Any]:
+        """Validate the monthly total range"""
+        minimum = attrs.get("monthly_total_min")
+        maximum = attrs.get("monthly_total_max")
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise serializers.ValidationError(
+                "monthly_total_min must not be greater than monthly_total_max"
+            )
+        return attrs
@@ -0,0 +1,73 @@
+"""
+Background tasks for quotes, run by `manage.py run_jobs`
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from core.jobs import task
+from core.models import Quote
+from core.models import QuoteEvent
+from core.models import QuotePriceHistory
+from core.models import QuoteSummary
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from quote.constants import RATE_VERSION
+from quote.serializers import QuoteDetailSerializer
+from quote.utils import calculate_quote_cost
+
+PRICE_FIELDS = ["monthly_subtotal", "monthly_taxes", "monthly_total"]
+
+
+@task("quote.reprice_quotes", lane="bulk")
+def reprice_quotes(state: str, batch_size: int = 1000) -> int:
+    """Reprice the state's quotes at the current rates, return how many changed
+
+    Each batch is updated in its own transaction together with the quotes'
+    price history and the summaries and event feeds of their users, so a
+    retry resumes with up to date totals. Users are locked in id order to
+    avoid deadlocking with another state's repricing.
+    """
+    changed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            quotes = list(
+                Quote.objects.in_states(state)
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .select_for_update()[:batch_size]
+            )
+            if not quotes:
+                return changed
+
+            repriced = []
+            deltas: dict[int, Decimal] = defaultdict(Decimal)
+            events: dict[int, list[QuoteEvent]] = defaultdict(list)
+            for quote in quotes:
+                prices = calculate_quote_cost(
+                    state, quote.flat_cost_coverages, quote.percentage_cost_coverages
+                )
+                if prices == tuple(getattr(quote, field) for field in PRICE_FIELDS):
+                    continue
+                deltas[quote.user_id] += prices[2] - quote.monthly_total
+                for field, price in zip(PRICE_FIELDS, prices):
+                    setattr(quote, field, price)
+                repriced.append(quote)
+                events[quote.user_id].append(
+                    QuoteEvent(
+                        quote_id=quote.id,
+                        event_type=QuoteEvent.EventType.UPDATED,
+                        payload=QuoteDetailSerializer(quote).data,
+                    )
+                )
+
+            Quote.objects.bulk_update(repriced, PRICE_FIELDS)
+            QuotePriceHistory.objects.record(repriced, RATE_VERSION)
+            for user_id in sorted(events):
+                if deltas[user_id]:
+                    QuoteSummary.objects.apply_delta(
+                        get_user_model()(pk=user_id), monthly_total=deltas[user_id]
+                    )
+                QuoteEvent.objects.append(user_id, *events[user_id])
+            changed += len(repriced)
+            last_id = quotes[-1].id
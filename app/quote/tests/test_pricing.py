@@ -0,0 +1,299 @@
+"""
+Tests for the integer cents pricing engine
+"""
+import dataclasses
+import itertools
+import typing as t
+from decimal import Decimal
+from decimal import ROUND_HALF_EVEN
+from math import floor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from core.models import Quote
+from core.models import QuoteEvent
+from core.models import QuotePriceHistory
+from core.models import QuoteSummary
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from quote.constants import QuoteCoverageTypes
+from quote.constants import STATE_MAPPING_COSTS
+from quote.coverages import Capped
+from quote.coverages import CoverageRegistry
+from quote.coverages import Flat
+from quote.coverages import Percentage
+from quote.coverages import PerUnit
+from quote.coverages import Tiered
+from quote.tasks import reprice_quotes
+from quote.utils import calculate_quote_cost
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+CENT = Decimal("0.01")
+
+
+def legacy_calculate_quote_cost(
+    state: str,
+    flat_cost_coverages: dict[str, t.Any],
+    percentage_cost_coverages: dict[str, t.Any],
+) -> tuple[Decimal, Decimal, Decimal]:
+    """The float pricing replaced by the integer cents engine
+
+    Returns the amounts as stored by the quote's DecimalFields, which round
+    half even to the cent.
+    """
+    state_coverage_cost = STATE_MAPPING_COSTS[state]
+    monthly_subtotal = 0.0
+
+    for k, v in flat_cost_coverages.items():
+        attr_cost = getattr(state_coverage_cost, f"{k}_cost")
+        if type(v) is bool and v is True:
+            monthly_subtotal += attr_cost
+        elif type(v) is str:
+            monthly_subtotal += getattr(attr_cost, v)
+
+    for k, v in percentage_cost_coverages.items():
+        attr_cost = getattr(state_coverage_cost, f"{k}_percentage_cost")
+        if type(v) is bool and v is True:
+            monthly_subtotal *= 1 + (attr_cost / 100)
+        elif type(v) is str:
+            monthly_subtotal *= 1 + (getattr(attr_cost, v) / 100)
+
+    monthly_taxes = monthly_subtotal * (state_coverage_cost.tax_rate / 100)
+    monthly_taxes = floor(monthly_taxes * 100) / 100
+    monthly_total = monthly_subtotal + monthly_taxes
+
+    return tuple(  # type: ignore
+        Decimal(amount).quantize(CENT, rounding=ROUND_HALF_EVEN)
+        for amount in (monthly_subtotal, monthly_taxes, monthly_total)
+    )
+
+
+class PricingEngineTests(SimpleTestCase):
+    """Test calculating quote costs in integer cents"""
+
+    def test_matches_legacy_pricing(self):
+        """Test every state and coverage combination prices as before"""
+        # No current rate lands on an exact half cent, which the float pricing
+        # rounded half even and the engine rounds half up, see test_rounding
+        for state, type_coverage, pet_coverage, flood_coverage in itertools.product(
+            STATE_MAPPING_COSTS,
+            QuoteCoverageTypes.values,
+            (False, True),
+            (False, True),
+        ):
+            args = (
+                state,
+                {"type_coverage": type_coverage, "pet_coverage": pet_coverage},
+                {"flood_coverage": flood_coverage},
+            )
+            with self.subTest(args=args):
+                self.assertEqual(
+                    calculate_quote_cost(*args), legacy_calculate_quote_cost(*args)
+                )
+
+    def test_quantized_to_the_cent(self):
+        """Test the amounts are returned with two decimal places"""
+        amounts = calculate_quote_cost(
+            "CA", {"type_coverage": "Basic"}, {"flood_coverage": True}
+        )
+
+        self.assertEqual(
+            [str(amount) for amount in amounts], ["20.40", "0.20", "20.60"]
+        )
+
+    @patch.dict(
+        STATE_MAPPING_COSTS,
+        {
+            "ZZ": SimpleNamespace(
+                type_coverage_cost=SimpleNamespace(Basic=21),
+                flood_coverage_percentage_cost=2.5,
+                tax_rate=0.25,
+            )
+        },
+    )
+    def test_rounding(self):
+        """Test the subtotal rounds half up and taxes round down to the cent"""
+        # 2100 cents * 102.5% = 2152.5 cents, taxed 0.25% = 5.38125 cents
+        amounts = calculate_quote_cost(
+            "ZZ", {"type_coverage": "Basic"}, {"flood_coverage": True}
+        )
+
+        self.assertEqual(amounts, (Decimal("21.53"), Decimal("0.05"), Decimal("21.58")))
+
+    def test_sub_cent_costs_refused(self):
+        """Test costs and rates are priced exactly or not at all"""
+        costs = SimpleNamespace(
+            type_coverage_cost=SimpleNamespace(Basic=21),
+            flood_coverage_percentage_cost=2.5,
+            tax_rate=8.875,
+        )
+        with patch.dict(STATE_MAPPING_COSTS, {"ZZ": costs}):
+            with self.assertRaisesMessage(ValueError, "Can't tax ZZ: 8.875"):
+                calculate_quote_cost("ZZ", {"type_coverage": "Basic"}, {})
+
+            costs.tax_rate = 8.88
+            costs.type_coverage_cost.Basic = 20.995
+            with self.assertRaisesMessage(ValueError, "type_coverage in ZZ: 20.995"):
+                calculate_quote_cost("ZZ", {"type_coverage": "Basic"}, {})
+
+    def test_unknown_state(self):
+        """Test pricing a state without coverage costs"""
+        with self.assertRaises(ValueError):
+            calculate_quote_cost("ZZ", {}, {})
+
+    def test_costs_replaced(self):
+        """Test the pricing function is compiled again for new state costs"""
+        costs = SimpleNamespace(
+            type_coverage_cost=SimpleNamespace(Basic=10),
+            flood_coverage_percentage_cost=0,
+            tax_rate=0,
+        )
+        with patch.dict(STATE_MAPPING_COSTS, {"CA": costs}):
+            amounts = calculate_quote_cost("CA", {"type_coverage": "Basic"}, {})
+
+        self.assertEqual(amounts[2], Decimal("10.00"))
+        self.assertEqual(
+            calculate_quote_cost("CA", {"type_coverage": "Basic"}, {})[2],
+            Decimal("20.20"),
+        )
+
+
+class CoverageRegistryTests(SimpleTestCase):
+    """Test compiling the coverage pricing rules"""
+
+    def setUp(self):
+        self.registry = CoverageRegistry()
+        self.registry.register(Flat("type_coverage"))
+        self.registry.register(PerUnit("pets", cost="pet_cost"))
+        self.registry.register(Tiered("rooms"))
+        self.registry.register(Capped("theft_coverage"))
+        self.registry.register(Percentage("flood_coverage"))
+        self.costs = SimpleNamespace(
+            type_coverage_cost=SimpleNamespace(Basic=20, Premium=40),
+            pet_cost=5,
+            rooms_cost=((2, 10), (5, 15), (None, 30)),
+            theft_coverage_percentage_cost=10,
+            theft_coverage_cap=3,
+            flood_coverage_percentage_cost=50,
+            tax_rate=1,
+        )
+        self.price = self.registry.compile("ZZ", self.costs)
+
+    def test_additive_coverages(self):
+        """Test flat, per-unit and tiered costs are summed"""
+        for rooms, subtotal in ((1, 4000), (2, 4000), (3, 4500), (9, 6000)):
+            with self.subTest(rooms=rooms):
+                prices = self.price(
+                    {"type_coverage": "Basic", "pets": 2, "rooms": rooms}, {}
+                )
+                self.assertEqual(prices[0], subtotal)
+
+    def test_multiplicative_coverages(self):
+        """Test percentages compound on the subtotal and capped ones stop at the cap"""
+        # 2000 cents + 10% = 2200 cents, then + 50% = 3300 cents
+        self.assertEqual(
+            self.price(
+                {"type_coverage": "Basic"},
+                {"theft_coverage": True, "flood_coverage": True},
+            ),
+            (3300, 33, 3333),
+        )
+        # 4000 cents + 10% capped at 300 cents
+        self.assertEqual(
+            self.price({"type_coverage": "Premium"}, {"theft_coverage": True}),
+            (4300, 43, 4343),
+        )
+
+    def test_missing_cost(self):
+        """Test a coverage the state has no cost for can only be left out"""
+        del self.costs.pet_cost
+        price = self.registry.compile("ZZ", self.costs)
+
+        self.assertEqual(price({"type_coverage": "Basic", "pets": 0}, {})[0], 2000)
+        with self.assertRaisesMessage(ValueError, "no pets cost specified for: ZZ"):
+            price({"type_coverage": "Basic", "pets": 1}, {})
+
+    def test_register_twice(self):
+        """Test a coverage type can only be registered once"""
+        with self.assertRaises(ValueError):
+            self.registry.register(Flat("type_coverage"))
+
+    def test_no_tiers(self):
+        """Test a tiered coverage needs at least one tier"""
+        self.costs.rooms_cost = ()
+
+        with self.assertRaisesMessage(ValueError, "rooms_cost cost of rooms"):
+            self.registry.compile("ZZ", self.costs)
+
+    def test_coverage_fields(self):
+        """Test the dataclass and serializer fields follow the registered rules"""
+        fields = self.registry.serializer_fields(additive=True)
+        coverages = self.registry.dataclass("Coverages", True, module=__name__)
+
+        self.assertEqual(list(fields), ["type_coverage", "pets", "rooms"])
+        self.assertEqual(
+            {field.name: field.type for field in dataclasses.fields(coverages)},
+            {"type_coverage": bool, "pets": int, "rooms": int},
+        )
+        self.assertEqual(fields["pets"].run_validation(2), 2)
+        with self.assertRaises(ValidationError):
+            fields["rooms"].run_validation(-1)
+        self.assertEqual(
+            list(self.registry.serializer_fields(additive=False)),
+            ["theft_coverage", "flood_coverage"],
+        )
+
+
+class RepriceQuotesTaskTests(TestCase):
+    """Test the task repricing a state's quotes"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testPassword123"
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for state in ("NY", "NY", "CA"):
+            client.post(
+                reverse("quote:quote-list"),
+                {
+                    "buyer_first_name": "Test",
+                    "buyer_last_name": "User",
+                    "state": state,
+                    "flat_cost_coverages": {
+                        "type_coverage": "Premium",
+                        "pet_coverage": True,
+                    },
+                    "percentage_cost_coverages": {"flood_coverage": True},
+                },
+                format="json",
+            )
+
+    def test_reprice_quotes(self):
+        """Test the state's quotes and their users' summaries are repriced"""
+        Quote.objects.in_states("NY").update(
+            monthly_subtotal=0, monthly_taxes=0, monthly_total=0
+        )
+        QuoteSummary.objects.filter(user=self.user).update(
+            monthly_total=Decimal("61.81")
+        )
+
+        changed = reprice_quotes("NY", batch_size=1)
+
+        self.assertEqual(changed, 2)
+        for quote in Quote.objects.in_states("NY"):
+            self.assertEqual(quote.monthly_subtotal, Decimal("66.00"))
+            self.assertEqual(quote.monthly_taxes, Decimal("1.32"))
+            self.assertEqual(quote.monthly_total, Decimal("67.32"))
+        summary = QuoteSummary.objects.get(user=self.user)
+        self.assertEqual(summary.monthly_total, Decimal("196.45"))
+        repriced = QuotePriceHistory.objects.filter(monthly_total_cents=6732)
+        self.assertEqual(repriced.count(), 4)
+        events = QuoteEvent.objects.filter(event_type="updated").order_by("id")
+        self.assertEqual(
+            [event.payload["monthly_total"] for event in events], ["67.32", "67.32"]
+        )
+        self.assertEqual(reprice_quotes("NY"), 0)
@@ -1,19 +1,40 @@
 """
 Tests for the quote API
 """
+import gzip
+import threading
+import time
+import unittest
 from decimal import Decimal
+from unittest.mock import patch
 
+from core.models import IdempotencyKey
 from core.models import Quote
+from core.models import QuoteEvent
+from core.models import QuotePriceHistory
+from core.models import QuoteSummary
 from core.models import User
+from core.renderers import msgpack
+from core.tests.query_budgets import QueryBudgetMixin
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db import connections
+from django.test import override_settings
 from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from quote.serializers import QuoteDetailSerializer
 from quote.serializers import QuoteSerializer
+from quote.tasks import reprice_quotes
+from quote.utils import calculate_quote_cost
 from rest_framework import status
 from rest_framework.test import APIClient
 
 QUOTES_URL = reverse("quote:quote-list")
+SUMMARY_URL = reverse("quote:quote-summary")
+PRICE_MATRIX_URL = reverse("quote:quote-price-matrix")
+EVENTS_URL = reverse("quote:quote-events")
 
 
 def _detail_url(quote_id: int) -> str:
@@ -52,8 +73,20 @@ class PublicQuoteAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_price_matrix_auth_required(self):
+        """Test auth is required to retrieve the price matrix"""
+        res = self.client.get(PRICE_MATRIX_URL)
 
-class PrivateQuoteAPITests(TestCase):
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_summary_auth_required(self):
+        """Test auth is required to retrieve the quote summary"""
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateQuoteAPITests(QueryBudgetMixin, TestCase):
     """Test authorized API requests"""
 
     def setUp(self):
@@ -68,7 +101,8 @@ class PrivateQuoteAPITests(TestCase):
         _create_quote(user=self.user)
         _create_quote(user=self.user)
 
-        res = self.client.get(QUOTES_URL)
+        with self.assertWithinQueryBudget("quote:quote-list"):
+            res = self.client.get(QUOTES_URL)
 
         quotes = Quote.objects.all().order_by("-id")
         serializer = QuoteSerializer(quotes, many=True)
@@ -76,17 +110,179 @@ class PrivateQuoteAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_quotes_queries_do_not_scale(self):
+        """Test listing quotes makes the same queries however many there are"""
+        self.assertQueriesDoNotScale(
+            "quote:quote-list",
+            lambda count: [_create_quote(user=self.user) for _ in range(count)],
+            lambda: self.client.get(QUOTES_URL),
+        )
+
+    def test_filter_quotes(self):
+        """Test filtering the list of quotes by the query parameters"""
+        basic_ca = _create_quote(
+            user=self.user,
+            state="CA",
+            buyer_first_name="Anna",
+            buyer_last_name="Smith",
+            flat_cost_coverages={"type_coverage": "Basic", "pet_coverage": False},
+            percentage_cost_coverages={"flood_coverage": False},
+            monthly_total=Decimal("20.20"),
+        )
+        premium_tx = _create_quote(
+            user=self.user,
+            state="TX",
+            buyer_first_name="Annabel",
+            buyer_last_name="Jones",
+            flat_cost_coverages={"type_coverage": "Premium", "pet_coverage": True},
+            percentage_cost_coverages={"flood_coverage": True},
+            monthly_total=Decimal("90.45"),
+        )
+        premium_ny = _create_quote(
+            user=self.user,
+            state="NY",
+            buyer_last_name="Smithers",
+            flat_cost_coverages={"type_coverage": "Premium", "pet_coverage": False},
+            percentage_cost_coverages={"flood_coverage": True},
+            monthly_total=Decimal("44.88"),
+        )
+        filters = [
+            ({"state": "CA"}, [basic_ca]),
+            ({"state": "CA,TX"}, [premium_tx, basic_ca]),
+            ({"type_coverage": "Premium"}, [premium_ny, premium_tx]),
+            ({"pet_coverage": "true"}, [premium_tx]),
+            ({"pet_coverage": "false"}, [premium_ny, basic_ca]),
+            ({"flood_coverage": "true", "state": "NY"}, [premium_ny]),
+            ({"monthly_total_min": "40", "monthly_total_max": "50"}, [premium_ny]),
+            ({"buyer_last_name": "smith"}, [premium_ny, basic_ca]),
+            ({"buyer_first_name": "ann"}, [premium_tx, basic_ca]),
+            ({"buyer_first_name": "ann", "buyer_last_name": "smith"}, [basic_ca]),
+        ]
+
+        for params, expected in filters:
+            res = self.client.get(QUOTES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [quote["id"] for quote in res.data],
+                [quote.id for quote in expected],
+                params,
+            )
+
+    def test_filter_quotes_bad_params(self):
+        """Test invalid filter parameters return an error"""
+        for params in [
+            {"state": "ZZ"},
+            {"type_coverage": "Super Premium"},
+            {"pet_coverage": "maybe"},
+            {"monthly_total_min": "50", "monthly_total_max": "40"},
+        ]:
+            res = self.client.get(QUOTES_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
+
     def test_get_quote_detail(self):
         """Test get quote detail"""
         quote = _create_quote(user=self.user)
 
         url = _detail_url(quote.id)
-        res = self.client.get(url)
+        with self.assertWithinQueryBudget("quote:quote-detail"):
+            res = self.client.get(url)
         serializer = QuoteDetailSerializer(quote)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_quotes_sparse_fields(self):
+        """Test listing only the requested fields, loading only their columns"""
+        quote = _create_quote(user=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(QUOTES_URL, {"fields": "id,monthly_total"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [{"id": quote.id, "monthly_total": "0.00"}])
+        (query,) = context.captured_queries
+        self.assertNotIn("coverages", query["sql"])
+        self.assertNotIn("buyer_first_name", query["sql"])
+
+    def test_list_quotes_default_fields_columns(self):
+        """Test the default list does not load the coverage columns"""
+        _create_quote(user=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(QUOTES_URL)
+
+        self.assertNotIn("coverages", context.captured_queries[0]["sql"])
+
+    def test_get_quote_detail_sparse_fields(self):
+        """Test retrieving only the requested fields of a quote"""
+        quote = _create_quote(user=self.user)
+
+        with self.assertWithinQueryBudget("quote:quote-detail"):
+            res = self.client.get(
+                _detail_url(quote.id), {"fields": "state,flat_cost_coverages"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json(),
+            {
+                "state": "CA",
+                "flat_cost_coverages": {"type_coverage": "Basic", "pet_coverage": True},
+            },
+        )
+
+    def test_sparse_fields_unknown_field(self):
+        """Test requesting an unknown field returns an error"""
+        res = self.client.get(QUOTES_URL, {"fields": "id,user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", res.data)
+
+    def test_list_quotes_gzipped(self):
+        """Test the quote list is compressed for clients accepting gzip"""
+        for _ in range(5):
+            _create_quote(user=self.user)
+
+        res = self.client.get(QUOTES_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(res.content),
+            self.client.get(QUOTES_URL).content,
+        )
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_list_quotes_msgpack(self):
+        """Test listing quotes in the MessagePack format"""
+        _create_quote(user=self.user)
+
+        res = self.client.get(QUOTES_URL, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        serializer = QuoteSerializer(Quote.objects.all(), many=True)
+        self.assertEqual(msgpack.unpackb(res.content), serializer.data)
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_create_quote_msgpack(self):
+        """Test creating a quote from a MessagePack body"""
+        payload = {
+            "buyer_first_name": "Test",
+            "buyer_last_name": "User",
+            "state": "TX",
+            "flat_cost_coverages": {"type_coverage": "Basic", "pet_coverage": True},
+            "percentage_cost_coverages": {"flood_coverage": False},
+        }
+
+        res = self.client.post(
+            QUOTES_URL,
+            msgpack.packb(payload),
+            content_type="application/msgpack",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Quote.objects.get(id=res.data["id"]).state, "TX")
+
     def test_create_quote(self):
         """Test creating a quote"""
         payload = {
@@ -99,7 +295,8 @@ class PrivateQuoteAPITests(TestCase):
             },
             "percentage_cost_coverages": {"flood_coverage": False},
         }
-        res = self.client.post(QUOTES_URL, payload, format="json")
+        with self.assertWithinQueryBudget("quote:quote-list", "POST"):
+            res = self.client.post(QUOTES_URL, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         quote = Quote.objects.get(id=res.data["id"])
@@ -120,7 +317,8 @@ class PrivateQuoteAPITests(TestCase):
 
         payload = {"buyer_first_name": "New", "buyer_last_name": "Name"}
         url = _detail_url(quote.id)
-        res = self.client.patch(url, payload)
+        with self.assertWithinQueryBudget("quote:quote-detail", "PATCH"):
+            res = self.client.patch(url, payload)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         quote.refresh_from_db()
@@ -148,7 +346,8 @@ class PrivateQuoteAPITests(TestCase):
             "percentage_cost_coverages": {"flood_coverage": True},
         }
         url = _detail_url(quote.id)
-        res = self.client.put(url, payload, format="json")
+        with self.assertWithinQueryBudget("quote:quote-detail", "PUT"):
+            res = self.client.put(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         quote.refresh_from_db()
@@ -157,6 +356,39 @@ class PrivateQuoteAPITests(TestCase):
             self.assertEqual(attribute, v)
         self.assertEqual(quote.user, self.user)
 
+    def test_update_reprices_quote(self):
+        """Test changing the coverages reprices the quote and records the price"""
+        res = self.client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+        url = _detail_url(res.data["id"])
+
+        self.client.patch(url, {"buyer_first_name": "Renamed"}, format="json")
+        res = self.client.patch(
+            url,
+            {"percentage_cost_coverages": {"flood_coverage": False}},
+            format="json",
+        )
+
+        self.assertEqual(res.data["monthly_subtotal"], "60.00")
+        self.assertEqual(res.data["monthly_taxes"], "1.20")
+        self.assertEqual(res.data["monthly_total"], "61.20")
+        history = QuotePriceHistory.objects.filter(quote_id=res.data["id"]).order_by(
+            "id"
+        )
+        self.assertEqual(
+            [
+                (
+                    row.monthly_subtotal_cents,
+                    row.monthly_taxes_cents,
+                    row.monthly_total_cents,
+                )
+                for row in history
+            ],
+            [(6600, 132, 6732), (6000, 120, 6120)],
+        )
+        self.assertEqual({row.rate_version for row in history}, {"1"})
+        summary = QuoteSummary.objects.get(user=self.user)
+        self.assertEqual(summary.monthly_total, Decimal("61.20"))
+
     def test_update_user_returns_error(self):
         """Test changing the quote user results in an error"""
         new_user = _create_user(email="newUser@example.com", password="testPassword123")
@@ -174,7 +406,8 @@ class PrivateQuoteAPITests(TestCase):
         quote = _create_quote(user=self.user)
 
         url = _detail_url(quote.id)
-        res = self.client.delete(url)
+        with self.assertWithinQueryBudget("quote:quote-detail", "DELETE"):
+            res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Quote.objects.filter(id=quote.id))
@@ -193,6 +426,78 @@ class PrivateQuoteAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(Quote.objects.filter(id=quote.id).exists())
 
+    def test_price_matrix(self):
+        """Test the price matrix matches the price of created quotes"""
+        with self.assertWithinQueryBudget("quote:quote-price-matrix"):
+            res = self.client.get(PRICE_MATRIX_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(Quote.objects.exists())
+        prices = res.data["prices"]
+        self.assertEqual(list(prices), ["CA", "NY", "TX"])
+        for state_prices in prices.values():
+            self.assertEqual(len(state_prices), 8)
+
+        created = self.client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+        combination = {
+            "type_coverage": "Premium",
+            "pet_coverage": True,
+            "flood_coverage": True,
+        }
+        (price,) = [
+            price
+            for price in prices["NY"]
+            if {key: price[key] for key in combination} == combination
+        ]
+        for field in ("monthly_subtotal", "monthly_taxes", "monthly_total"):
+            self.assertEqual(price[field], created.data[field])
+
+    def test_price_matrix_states(self):
+        """Test only including the requested states in the price matrix"""
+        res = self.client.get(PRICE_MATRIX_URL, {"state": "TX,CA"})
+
+        self.assertEqual(list(res.data["prices"]), ["CA", "TX"])
+
+    def test_price_matrix_bad_state(self):
+        """Test requesting the price matrix of an unknown state"""
+        res = self.client.get(PRICE_MATRIX_URL, {"state": "XX"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_summary_without_quotes(self):
+        """Test the summary for a user without quotes is empty"""
+        with self.assertWithinQueryBudget("quote:quote-summary"):
+            res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["quote_count"], 0)
+        self.assertEqual(Decimal(res.data["monthly_total"]), Decimal("0"))
+
+    def test_summary_tracks_created_and_deleted_quotes(self):
+        """Test the summary is maintained when quotes are created and deleted"""
+        payload = {
+            "buyer_first_name": "Test",
+            "buyer_last_name": "User",
+            "state": "TX",
+            "flat_cost_coverages": {"type_coverage": "Premium", "pet_coverage": True},
+            "percentage_cost_coverages": {"flood_coverage": True},
+        }
+        res = self.client.post(QUOTES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        payload["state"] = "CA"
+        res = self.client.post(QUOTES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data["quote_count"], 2)
+        self.assertEqual(Decimal(res.data["monthly_total"]), Decimal("152.26"))
+
+        self.client.delete(_detail_url(Quote.objects.get(state="TX").id))
+
+        summary = QuoteSummary.objects.get(user=self.user)
+        self.assertEqual(summary.quote_count, 1)
+        self.assertEqual(summary.monthly_total, Decimal("61.81"))
+
     def test_create_quote_bad_data_state(self):
         """Test creating a quote with bad data"""
         payload = {"state": None}
@@ -584,3 +889,284 @@ class PrivateQuoteAPITests(TestCase):
         self.assertEqual(quote.monthly_subtotal, Decimal("40"))
         self.assertEqual(quote.monthly_taxes, Decimal("0.80"))
         self.assertEqual(quote.monthly_total, Decimal("40.80"))
+
+
+QUOTE_PAYLOAD = {
+    "buyer_first_name": "Test",
+    "buyer_last_name": "User",
+    "state": "NY",
+    "flat_cost_coverages": {"type_coverage": "Premium", "pet_coverage": True},
+    "percentage_cost_coverages": {"flood_coverage": True},
+}
+
+
+class IdempotentQuoteCreateTests(TestCase):
+    """Test creating quotes with an Idempotency-Key"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = _create_user(email="test@example.com", password="testPassword123")
+        self.client.force_authenticate(self.user)
+
+    def _create(self, key: str, payload: dict | None = None):
+        return self.client.post(
+            QUOTES_URL,
+            payload or QUOTE_PAYLOAD,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_replay_returns_original_response(self):
+        """Test a retry returns the first response without pricing again"""
+        with patch(
+            "quote.utils.calculate_quote_cost", wraps=calculate_quote_cost
+        ) as patched_cost:
+            first = self._create("retry-1")
+            replay = self._create("retry-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+        self.assertEqual(patched_cost.call_count, 1)
+        self.assertEqual(Quote.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(QuoteSummary.objects.get(user=self.user).quote_count, 1)
+
+    def test_key_reused_for_different_request(self):
+        """Test reusing a key with a different body is rejected"""
+        self._create("retry-1")
+
+        res = self._create("retry-1", {**QUOTE_PAYLOAD, "state": "TX"})
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Quote.objects.filter(user=self.user).count(), 1)
+
+    def test_failed_request_releases_key(self):
+        """Test a request failing validation does not use up its key"""
+        res = self._create("retry-1", {**QUOTE_PAYLOAD, "state": "XX"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        res = self._create("retry-1", {**QUOTE_PAYLOAD, "state": "XX"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self._create("retry-1")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_per_user(self):
+        """Test another user's request with the same key creates its own quote"""
+        self._create("retry-1")
+        other_user = _create_user(email="other@example.com", password="testPass123")
+        self.client.force_authenticate(other_user)
+
+        res = self._create("retry-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertEqual(Quote.objects.get(id=res.data["id"]).user, other_user)
+
+    def test_invalid_key(self):
+        """Test an empty or too long key is rejected"""
+        for key in ("", "k" * 256):
+            with self.subTest(key=key):
+                res = self._create(key)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Quote.objects.exists())
+
+
+class IdempotentQuoteCreateConcurrencyTests(TransactionTestCase):
+    """Test concurrent requests with the same Idempotency-Key"""
+
+    def test_concurrent_duplicates_create_one_quote(self):
+        """Test a duplicate sent while the first is in flight replays it"""
+        user = _create_user(email="test@example.com", password="testPassword123")
+
+        def slow_calculate_quote_cost(*args, **kwargs):
+            # Hold the first request's transaction open while the duplicate
+            # arrives
+            time.sleep(0.3)
+            return calculate_quote_cost(*args, **kwargs)
+
+        responses = []
+
+        def create():
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                responses.append(
+                    client.post(
+                        QUOTES_URL,
+                        QUOTE_PAYLOAD,
+                        format="json",
+                        HTTP_IDEMPOTENCY_KEY="retry-1",
+                    )
+                )
+            finally:
+                connections.close_all()
+
+        with patch(
+            "quote.utils.calculate_quote_cost", side_effect=slow_calculate_quote_cost
+        ) as patched_cost:
+            threads = [threading.Thread(target=create) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([res.status_code for res in responses], [201, 201])
+        self.assertEqual(responses[0].json(), responses[1].json())
+        self.assertEqual(patched_cost.call_count, 1)
+        self.assertEqual(Quote.objects.count(), 1)
+
+
+class QuoteDeleteRepriceConcurrencyTests(TransactionTestCase):
+    """Test deleting a quote while its state is repriced"""
+
+    def test_delete_during_reprice(self):
+        """Test both finish and the summary keeps the repriced total"""
+        user = _create_user(email="test@example.com", password="testPassword123")
+        client = APIClient()
+        client.force_authenticate(user)
+        quote_id = client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json").data["id"]
+        # A stale price for the repricing to change
+        Quote.objects.filter(pk=quote_id).update(
+            monthly_subtotal=0, monthly_taxes=0, monthly_total=Decimal("1.00")
+        )
+        QuoteSummary.objects.filter(user=user).update(monthly_total=Decimal("1.00"))
+
+        repricing = threading.Event()
+
+        def slow_calculate_quote_cost(*args, **kwargs):
+            # Hold the quote locked while the delete arrives
+            repricing.set()
+            time.sleep(0.3)
+            return calculate_quote_cost(*args, **kwargs)
+
+        results = {}
+
+        def reprice():
+            try:
+                results["changed"] = reprice_quotes(QUOTE_PAYLOAD["state"])
+            finally:
+                connections.close_all()
+
+        with patch(
+            "quote.tasks.calculate_quote_cost", side_effect=slow_calculate_quote_cost
+        ):
+            thread = threading.Thread(target=reprice)
+            thread.start()
+            repricing.wait(5)
+            res = client.delete(_detail_url(quote_id))
+            thread.join()
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(results["changed"], 1)
+        self.assertFalse(Quote.objects.exists())
+        summary = QuoteSummary.objects.get(user=user)
+        self.assertEqual(summary.quote_count, 0)
+        self.assertEqual(summary.monthly_total, Decimal(0))
+
+
+class QuoteEventFeedTests(QueryBudgetMixin, TestCase):
+    """Test the quote events outbox and change feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = _create_user(email="test@example.com", password="testPassword123")
+        self.client.force_authenticate(self.user)
+
+    def test_events_recorded(self):
+        """Test creating, updating and deleting a quote appends events in order"""
+        created = self.client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+        url = _detail_url(created.data["id"])
+        updated = self.client.patch(url, {"buyer_last_name": "Other"}, format="json")
+        self.client.delete(url)
+
+        with self.assertWithinQueryBudget("quote:quote-events"):
+            res = self.client.get(EVENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        events = res.data["events"]
+        self.assertEqual(
+            [event["event_type"] for event in events], ["created", "updated", "deleted"]
+        )
+        self.assertEqual({event["quote_id"] for event in events}, {created.data["id"]})
+        self.assertEqual(events[0]["payload"], created.data)
+        self.assertEqual(events[1]["payload"], updated.data)
+        self.assertEqual(events[2]["payload"], {"id": created.data["id"]})
+        self.assertEqual(res.data["last_id"], events[2]["id"])
+
+    def test_events_after(self):
+        """Test tailing the feed from the last event id in pages"""
+        for _ in range(3):
+            self.client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+
+        first = self.client.get(EVENTS_URL, {"limit": 2})
+        second = self.client.get(EVENTS_URL, {"after": first.data["last_id"]})
+        third = self.client.get(EVENTS_URL, {"after": second.data["last_id"]})
+
+        self.assertEqual(len(first.data["events"]), 2)
+        self.assertEqual(len(second.data["events"]), 1)
+        self.assertGreater(second.data["events"][0]["id"], first.data["last_id"])
+        self.assertEqual(third.data, {"events": [], "last_id": second.data["last_id"]})
+
+    def test_events_limited_to_user(self):
+        """Test the feed only includes the authenticated user's events"""
+        other_user = _create_user(email="other@example.com", password="password123")
+        other_client = APIClient()
+        other_client.force_authenticate(other_user)
+        other_client.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+
+        res = self.client.get(EVENTS_URL)
+
+        self.assertEqual(res.data["events"], [])
+
+    @override_settings(QUOTE_EVENTS_POLL_SECONDS=0.05)
+    def test_events_wait_timeout(self):
+        """Test waiting for events returns an empty page once the time is up"""
+        start = time.monotonic()
+        res = self.client.get(EVENTS_URL, {"wait": 0.2})
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(res.data, {"events": [], "last_id": 0})
+
+    def test_events_bad_params(self):
+        """Test waiting longer than allowed or a negative id is rejected"""
+        res = self.client.get(EVENTS_URL, {"wait": 3600, "after": -1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("wait", res.data)
+        self.assertIn("after", res.data)
+
+
+class QuoteEventLongPollTests(TransactionTestCase):
+    """Test waiting for quote events while another request writes"""
+
+    def test_event_wakes_waiting_request(self):
+        """Test a waiting request returns as soon as an event is committed"""
+        user = _create_user(email="test@example.com", password="testPassword123")
+
+        def create_quote():
+            try:
+                time.sleep(0.3)
+                writer = APIClient()
+                writer.force_authenticate(user)
+                writer.post(QUOTES_URL, QUOTE_PAYLOAD, format="json")
+            finally:
+                connections.close_all()
+
+        client = APIClient()
+        client.force_authenticate(user)
+        thread = threading.Thread(target=create_quote)
+        thread.start()
+        start = time.monotonic()
+        res = client.get(EVENTS_URL, {"wait": 10})
+        thread.join()
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(
+            [event["event_type"] for event in res.data["events"]], ["created"]
+        )
+        self.assertEqual(QuoteEvent.objects.count(), 1)
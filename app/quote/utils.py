@@ -2,12 +2,17 @@
 Utility functionality to be leveraged for the Quote API
 """
 import dataclasses
+import functools
+import itertools
 import json
 import typing as t
 from decimal import Decimal
-from math import floor
 
+from core import metrics
+from quote.constants import COVERAGES
+from quote.constants import QuoteCoverageTypes
 from quote.constants import STATE_MAPPING_COSTS
+from quote.coverages import PricingFunction
 
 
 class EnhancedJSONEncoder(json.JSONEncoder):
@@ -17,46 +22,89 @@ class EnhancedJSONEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+def to_cents(amount: Decimal) -> int:
+    """Return an amount quantized to the cent as a number of cents"""
+    return int(amount.scaleb(2))
+
+
+@functools.lru_cache(maxsize=4096)
+def from_cents(cents: int) -> Decimal:
+    """Return an amount in cents as a Decimal quantized to the cent
+
+    Cached as quotes share a handful of prices, and Decimals are immutable.
+    """
+    return Decimal(cents).scaleb(-2)
+
+
+# Pricing function compiled for each state, with the costs it was compiled for
+_pricing_functions: dict[str, tuple[t.Any, PricingFunction]] = {}
+
+
+def pricing_function(state: str) -> PricingFunction:
+    """Return the state's compiled pricing function, see quote.coverages
+
+    Compiled again when the state's costs are replaced.
+    """
+    costs = STATE_MAPPING_COSTS.get(state)
+    if costs is None:
+        raise ValueError(f"There is no coverage cost specified for: {state}")
+
+    compiled = _pricing_functions.get(state)
+    if compiled is None or compiled[0] is not costs:
+        compiled = _pricing_functions[state] = (costs, COVERAGES.compile(state, costs))
+    return compiled[1]
+
+
+@metrics.timed_function("pricing")
 def calculate_quote_cost(
     state: str,
     flat_cost_coverages: dict[str, t.Any],
     percentage_cost_coverages: dict[str, t.Any],
 ) -> tuple[Decimal, Decimal, Decimal]:
     """Takes the quote's state and coverages and returns the subtotal and taxes for a quote"""
-    monthly_subtotal = 0.0
-    monthly_taxes = 0.0
-    monthly_total = 0.0
-
-    state_coverage_cost = STATE_MAPPING_COSTS.get(state)
-
-    if state_coverage_cost is None:
-        raise ValueError(f"There is no coverage cost specified for: {state}")
-
-    for k, v in flat_cost_coverages.items():
-        attribute_name = f"{k}_cost"
-        if type(v) is bool and v is True:
-            attr_cost = getattr(state_coverage_cost, attribute_name)
-            monthly_subtotal += attr_cost
+    monthly_subtotal, monthly_taxes, monthly_total = pricing_function(state)(
+        flat_cost_coverages, percentage_cost_coverages
+    )
 
-        elif type(v) is str:
-            attr_class = getattr(state_coverage_cost, attribute_name)
-            attr_cost = getattr(attr_class, v)
-            monthly_subtotal += attr_cost
+    return (
+        from_cents(monthly_subtotal),
+        from_cents(monthly_taxes),
+        from_cents(monthly_total),
+    )
 
-    for k, v in percentage_cost_coverages.items():
-        attribute_name = f"{k}_percentage_cost"
-        if type(v) is bool and v is True:
-            attr_cost = getattr(state_coverage_cost, attribute_name)
-            monthly_subtotal *= 1 + (attr_cost / 100)
 
-        elif type(v) is str:
-            attr_class = getattr(state_coverage_cost, attribute_name)
-            attr_cost = getattr(attr_class, v)
-            monthly_subtotal *= 1 + (attr_cost / 100)
+@functools.lru_cache(maxsize=None)
+def price_matrix(rate_version: str) -> dict[str, list[dict[str, t.Any]]]:
+    """Return the price of every coverage combination for every state
 
-    monthly_taxes = monthly_subtotal * (state_coverage_cost.tax_rate / 100)
-    monthly_taxes = floor(monthly_taxes * 100) / 100
+    Cached per rate version, so pass quote.constants.RATE_VERSION.
+    """
+    matrix = {}
+    for state in STATE_MAPPING_COSTS:
+        prices = []
+        for type_coverage, pet_coverage, flood_coverage in itertools.product(
+            QuoteCoverageTypes.values, (False, True), (False, True)
+        ):
+            monthly_subtotal, monthly_taxes, monthly_total = calculate_quote_cost(
+                state,
+                {"type_coverage": type_coverage, "pet_coverage": pet_coverage},
+                {"flood_coverage": flood_coverage},
+            )
+            prices.append(
+                {
+                    "type_coverage": type_coverage,
+                    "pet_coverage": pet_coverage,
+                    "flood_coverage": flood_coverage,
+                    "monthly_subtotal": monthly_subtotal,
+                    "monthly_taxes": monthly_taxes,
+                    "monthly_total": monthly_total,
+                }
+            )
+        matrix[str(state)] = prices
+    return matrix
 
-    monthly_total = monthly_subtotal + monthly_taxes
 
-    return (Decimal(monthly_subtotal), Decimal(monthly_taxes), Decimal(monthly_total))
+# Compile the states' pricing functions on import rather than for their first
+# quote
+for _state in STATE_MAPPING_COSTS:
+    pricing_function(_state)
@@ -1,55 +1,423 @@
 """
 Views for the Quote APIs
 """
+import time
+
 import quote.utils as quote_util
+from core import db_router
+from core import parsers
+from core import renderers
+from core.authentication import TokenAuthentication
+from core.idempotency import IdempotentCreateMixin
 from core.models import Quote
+from core.models import QuoteEvent
+from core.models import QuotePriceHistory
+from core.models import QuoteSummary
+from django.conf import settings
+from django.db import transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema_view
+from drf_spectacular.utils import OpenApiParameter
+from quote.constants import QuoteCoverageTypes
+from quote.constants import RATE_VERSION
 from quote.constants import States
+from quote.serializers import PriceMatrixParamsSerializer
+from quote.serializers import PriceMatrixSerializer
+from quote.serializers import QUOTE_DETAIL_FIELDS
 from quote.serializers import QuoteDetailSerializer
+from quote.serializers import QuoteEventFeedParamsSerializer
+from quote.serializers import QuoteEventFeedSerializer
+from quote.serializers import QuoteFilterSerializer
 from quote.serializers import QuoteSerializer
+from quote.serializers import QuoteSummarySerializer
 from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.serializers import ModelSerializer
+from rest_framework.settings import api_settings
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    "fields",
+    OpenApiTypes.STR,
+    description=(
+        "Comma separated list of fields to return, any of: "
+        f"{', '.join(QUOTE_DETAIL_FIELDS)}"
+    ),
+)
 
 
-class QuoteViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            FIELDS_PARAMETER,
+            OpenApiParameter(
+                "state",
+                OpenApiTypes.STR,
+                enum=States.values,
+                description="Comma separated list of states to filter by",
+            ),
+            OpenApiParameter(
+                "type_coverage",
+                OpenApiTypes.STR,
+                enum=QuoteCoverageTypes.values,
+                description="Type of coverage to filter by",
+            ),
+            OpenApiParameter(
+                "pet_coverage",
+                OpenApiTypes.BOOL,
+                description="Filter by quotes with or without pet coverage",
+            ),
+            OpenApiParameter(
+                "flood_coverage",
+                OpenApiTypes.BOOL,
+                description="Filter by quotes with or without flood coverage",
+            ),
+            OpenApiParameter(
+                "monthly_total_min",
+                OpenApiTypes.DECIMAL,
+                description="Minimum monthly total to filter by",
+            ),
+            OpenApiParameter(
+                "monthly_total_max",
+                OpenApiTypes.DECIMAL,
+                description="Maximum monthly total to filter by",
+            ),
+            OpenApiParameter(
+                "buyer_first_name",
+                OpenApiTypes.STR,
+                description="Prefix of the buyer's first name to filter by",
+            ),
+            OpenApiParameter(
+                "buyer_last_name",
+                OpenApiTypes.STR,
+                description="Prefix of the buyer's last name to filter by",
+            ),
+        ]
+    ),
+    retrieve=extend_schema(parameters=[FIELDS_PARAMETER]),
+    create=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                OpenApiTypes.STR,
+                OpenApiParameter.HEADER,
+                description=(
+                    "Unique key for the request, retries with the same key "
+                    "return the original response instead of creating a quote"
+                ),
+            )
+        ]
+    ),
+)
+class QuoteViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """View for manage Quote APIs"""
 
     serializer_class = QuoteSerializer
     queryset = Quote.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_class = [IsAuthenticated]
+    renderer_classes = (
+        api_settings.DEFAULT_RENDERER_CLASSES + renderers.OPTIONAL_RENDERERS
+    )
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + parsers.OPTIONAL_PARSERS
+
+    def list(self, request, *args, **kwargs):
+        """List quotes for authenticated user from a read replica"""
+        with db_router.replica_reads(request.user):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a quote for authenticated user from a read replica"""
+        with db_router.replica_reads(request.user):
+            return super().retrieve(request, *args, **kwargs)
 
     def get_queryset(self):
         """Retrieve quotes for authenticated user"""
         if self.request.user.id is None:
             raise AuthenticationFailed("Unauthorized", code=401)
-        return self.queryset.filter(user=self.request.user).order_by("-id")
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == "list":
+            queryset = self._filter_queryset_by_params(queryset)
+        if self.action == "destroy":
+            queryset = queryset.select_for_update()
+        if self.action in ("list", "retrieve"):
+            # Only load the columns that are rendered, which also skips decoding
+            # the coverage JSON when it isn't requested
+            queryset = queryset.only(
+                *(
+                    name
+                    for name in self._rendered_fields()
+                    if name in QUOTE_DETAIL_FIELDS
+                )
+            )
+
+        return queryset.order_by("-id")
+
+    def _query_params_with_states(self):
+        """Return the query parameters with comma separated states split up"""
+        query_params = self.request.query_params.copy()
+        if "state" in query_params:
+            query_params.setlist(
+                "state",
+                [
+                    state
+                    for value in query_params.getlist("state")
+                    for state in value.split(",")
+                ],
+            )
+        return query_params
+
+    def _requested_fields(self) -> tuple[str, ...] | None:
+        """Return the fields requested with the `fields` query parameter"""
+        if self.action not in ("list", "retrieve"):
+            return None
+        value = self.request.query_params.get("fields")
+        if not value:
+            return None
+
+        fields = tuple(name.strip() for name in value.split(",") if name.strip())
+        unknown = [name for name in fields if name not in QUOTE_DETAIL_FIELDS]
+        if unknown:
+            raise ValidationError({"fields": [f"Unknown fields: {', '.join(unknown)}"]})
+        return fields
+
+    def _rendered_fields(self) -> tuple[str, ...]:
+        """Return the fields the response will include"""
+        return self._requested_fields() or self.get_serializer_class().Meta.fields
+
+    def _filter_queryset_by_params(self, queryset):
+        """Apply the list query parameters to the queryset"""
+        params = QuoteFilterSerializer(data=self._query_params_with_states())
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        if filters.get("state"):
+            queryset = queryset.in_states(*filters["state"])
+
+        # Coverage filters use JSON containment so they can be served by the
+        # GIN indexes on the coverage columns
+        flat_cost_coverages = {
+            k: filters[k]
+            for k in ("type_coverage", "pet_coverage")
+            if filters.get(k) is not None
+        }
+        if flat_cost_coverages:
+            queryset = queryset.filter(
+                flat_cost_coverages__contains=flat_cost_coverages
+            )
+        if filters.get("flood_coverage") is not None:
+            queryset = queryset.filter(
+                percentage_cost_coverages__contains={
+                    "flood_coverage": filters["flood_coverage"]
+                }
+            )
+
+        if filters.get("monthly_total_min") is not None:
+            queryset = queryset.filter(monthly_total__gte=filters["monthly_total_min"])
+        if filters.get("monthly_total_max") is not None:
+            queryset = queryset.filter(monthly_total__lte=filters["monthly_total_max"])
+        if filters.get("buyer_first_name"):
+            queryset = queryset.filter(
+                buyer_first_name__istartswith=filters["buyer_first_name"]
+            )
+        if filters.get("buyer_last_name"):
+            queryset = queryset.filter(
+                buyer_last_name__istartswith=filters["buyer_last_name"]
+            )
+
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request"""
-        if self.action == "list":
+        if self.action == "list" and self._requested_fields() is None:
             return QuoteSerializer
+        if self.action == "summary":
+            return QuoteSummarySerializer
+        if self.action == "price_matrix":
+            return PriceMatrixSerializer
+        if self.action == "events":
+            return QuoteEventFeedSerializer
 
         return QuoteDetailSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer restricted to the requested fields"""
+        fields = self._requested_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def _price(self, serializer: ModelSerializer) -> None:
+        """Price the quote being saved, falling back to the instance's values"""
+        data = serializer.validated_data
+        instance = serializer.instance
+        if "state" in data:
+            data["state"] = States(data["state"])
+        (
+            data["monthly_subtotal"],
+            data["monthly_taxes"],
+            data["monthly_total"],
+        ) = quote_util.calculate_quote_cost(
+            data["state"] if "state" in data else instance.state,
+            data.get(
+                "flat_cost_coverages", getattr(instance, "flat_cost_coverages", {})
+            ),
+            data.get(
+                "percentage_cost_coverages",
+                getattr(instance, "percentage_cost_coverages", {}),
+            ),
+        )
+
+    @transaction.atomic
     def perform_create(self, serializer: ModelSerializer):
         """Create a new quote"""
+        self._price(serializer)
+        quote = serializer.save(user=self.request.user)
+        db_router.pin_to_primary(self.request.user)
+        QuoteSummary.objects.apply_delta(
+            self.request.user, quote_count=1, monthly_total=quote.monthly_total
+        )
+        QuotePriceHistory.objects.record([quote], RATE_VERSION)
+        QuoteEvent.objects.append(
+            self.request.user.pk,
+            QuoteEvent(
+                quote_id=quote.id,
+                event_type=QuoteEvent.EventType.CREATED,
+                payload=serializer.data,
+            ),
+        )
 
-        serializer.validated_data["state"] = States(serializer.validated_data["state"])
+    @transaction.atomic
+    def perform_update(self, serializer: ModelSerializer):
+        """Update a quote, repricing it for its new state and coverages"""
+        instance = serializer.instance
+        previous_prices = (
+            instance.monthly_subtotal,
+            instance.monthly_taxes,
+            instance.monthly_total,
+        )
+        self._price(serializer)
+        quote = serializer.save()
+        db_router.pin_to_primary(self.request.user)
+        if quote.monthly_total != previous_prices[2]:
+            QuoteSummary.objects.apply_delta(
+                self.request.user,
+                monthly_total=quote.monthly_total - previous_prices[2],
+            )
+        if (quote.monthly_subtotal, quote.monthly_taxes, quote.monthly_total) != (
+            previous_prices
+        ):
+            QuotePriceHistory.objects.record([quote], RATE_VERSION)
+        QuoteEvent.objects.append(
+            self.request.user.pk,
+            QuoteEvent(
+                quote_id=quote.id,
+                event_type=QuoteEvent.EventType.UPDATED,
+                payload=serializer.data,
+            ),
+        )
 
-        (
-            monthly_subtotal,
-            monthly_taxes,
-            monthly_total,
-        ) = quote_util.calculate_quote_cost(
-            serializer.validated_data["state"],
-            serializer.validated_data["flat_cost_coverages"],
-            serializer.validated_data["percentage_cost_coverages"],
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        """Delete a quote
+
+        The quote is locked as it's looked up, before the user's summary and
+        event feed, in the order reprice_quotes takes them, and its total is
+        read under the lock so a concurrent repricing isn't undone in the
+        summary.
+        """
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance: Quote):
+        """Delete a quote, locked when destroy looked it up"""
+        QuoteSummary.objects.apply_delta(
+            self.request.user, quote_count=-1, monthly_total=-instance.monthly_total
+        )
+        QuoteEvent.objects.append(
+            self.request.user.pk,
+            QuoteEvent(
+                quote_id=instance.id,
+                event_type=QuoteEvent.EventType.DELETED,
+                payload={"id": instance.id},
+            ),
         )
-        serializer.validated_data["monthly_subtotal"] = monthly_subtotal
-        serializer.validated_data["monthly_taxes"] = monthly_taxes
-        serializer.validated_data["monthly_total"] = monthly_total
+        instance.delete()
+        db_router.pin_to_primary(self.request.user)
+
+    @action(methods=["GET"], detail=False)
+    def summary(self, request):
+        """Retrieve the quote count and monthly premium for authenticated user"""
+        if request.user.id is None:
+            raise AuthenticationFailed("Unauthorized", code=401)
+        with db_router.replica_reads(request.user):
+            summary = QuoteSummary.objects.filter(user=request.user).first()
+        if summary is None:
+            summary = QuoteSummary(user=request.user)
 
-        serializer.save(user=self.request.user)
+        serializer = self.get_serializer(summary)
+        return Response(serializer.data)
+
+    @extend_schema(parameters=[QuoteEventFeedParamsSerializer])
+    @action(methods=["GET"], detail=False)
+    def events(self, request):
+        """Tail the changes to the authenticated user's quotes, oldest first
+
+        Consumers pass the last event id they processed as `after`. With
+        `wait`, the request holds until an event arrives or the time is up.
+        """
+        if request.user.id is None:
+            raise AuthenticationFailed("Unauthorized", code=401)
+        params = QuoteEventFeedParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        after = params.validated_data["after"]
+        deadline = time.monotonic() + params.validated_data["wait"]
+
+        with db_router.replica_reads(request.user):
+            while True:
+                events = list(
+                    QuoteEvent.objects.filter(user=request.user, id__gt=after).order_by(
+                        "id"
+                    )[: params.validated_data["limit"]]
+                )
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    break
+                time.sleep(min(settings.QUOTE_EVENTS_POLL_SECONDS, remaining))
+
+        serializer = self.get_serializer(
+            {"events": events, "last_id": events[-1].id if events else after}
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "state",
+                OpenApiTypes.STR,
+                enum=States.values,
+                description="Comma separated list of states, defaults to every state",
+            )
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="price-matrix")
+    def price_matrix(self, request):
+        """Price every coverage combination without creating quotes"""
+        if request.user.id is None:
+            raise AuthenticationFailed("Unauthorized", code=401)
+        params = PriceMatrixParamsSerializer(data=self._query_params_with_states())
+        params.is_valid(raise_exception=True)
+
+        matrix = quote_util.price_matrix(RATE_VERSION)
+        states = params.validated_data.get("state") or matrix.keys()
+        serializer = self.get_serializer(
+            {
+                "rate_version": RATE_VERSION,
+                "prices": {state: matrix[state] for state in sorted(states)},
+            }
+        )
+        return Response(serializer.data)
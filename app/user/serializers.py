@@ -3,6 +3,7 @@ Serializers for the User API View
 """
 import typing as t
 
+from core.metrics import TimedSerializerMixin
 from core.models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
@@ -11,7 +12,7 @@ from rest_framework import serializers
 from rest_framework.serializers import ValidationError
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object"""
 
     class Meta:
@@ -35,7 +36,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class AuthTokenSerializer(serializers.Serializer):
+class AuthTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for the User Auth token"""
 
     email = serializers.EmailField()
@@ -1,9 +1,14 @@
 """
 Tests for the user API
 """
+from datetime import timedelta
+
+from core.models import TokenUsage
+from core.tests.query_budgets import QueryBudgetMixin
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -17,7 +22,7 @@ def _create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicUserAPITests(TestCase):
+class PublicUserAPITests(QueryBudgetMixin, TestCase):
     """Test the public features of the user API"""
 
     def setUp(self):
@@ -30,7 +35,8 @@ class PublicUserAPITests(TestCase):
             "password": "testPassword123",
             "name": "Test User",
         }
-        res = self.client.post(CREATE_USER_URL, payload)
+        with self.assertWithinQueryBudget("user:create", "POST"):
+            res = self.client.post(CREATE_USER_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         user = get_user_model().objects.get(email=payload["email"])
@@ -74,11 +80,30 @@ class PublicUserAPITests(TestCase):
             "email": user_details["email"],
             "password": user_details["password"],
         }
-        res = self.client.post(TOKEN_URL, payload)
+        with self.assertWithinQueryBudget("user:token", "POST"):
+            res = self.client.post(TOKEN_URL, payload)
 
         self.assertIn("token", res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_create_token_reused_until_expired(self):
+        """Test the user's token is returned again until it expires"""
+        payload = {"email": "test@example.com", "password": "testPassword123"}
+        _create_user(**payload)
+
+        token = self.client.post(TOKEN_URL, payload).data["token"]
+        self.assertEqual(self.client.post(TOKEN_URL, payload).data["token"], token)
+
+        TokenUsage.objects.update(last_used_at=timezone.now() - timedelta(days=31))
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data["token"], token)
+        self.assertEqual(
+            list(TokenUsage.objects.values_list("token_id", flat=True)),
+            [res.data["token"]],
+        )
+
     def test_create_token_bad_credentials(self):
         """Test returns error if credentials invalid"""
         _create_user(email="test@example.com", password="testPassword123")
@@ -106,7 +131,7 @@ class PublicUserAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateUserAPITests(TestCase):
+class PrivateUserAPITests(QueryBudgetMixin, TestCase):
     """Test API requests that require authenitcation"""
 
     def setUp(self):
@@ -120,7 +145,8 @@ class PrivateUserAPITests(TestCase):
 
     def test_retrieve_profile_success(self):
         """Test retrieving profile for logged in user"""
-        res = self.client.get(ABOUT_URL)
+        with self.assertWithinQueryBudget("user:about"):
+            res = self.client.get(ABOUT_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(
@@ -144,7 +170,8 @@ class PrivateUserAPITests(TestCase):
             "password": "newPassword123",
         }
 
-        res = self.client.patch(ABOUT_URL, payload)
+        with self.assertWithinQueryBudget("user:about", "PATCH"):
+            res = self.client.patch(ABOUT_URL, payload)
 
         self.user.refresh_from_db()
         self.assertEqual(self.user.name, payload["name"])
@@ -1,10 +1,12 @@
 """
 Views for the User API
 """
-from rest_framework import authentication
+from core.authentication import TokenAuthentication
+from core.models import TokenUsage
 from rest_framework import generics
 from rest_framework import permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 from user.serializers import AuthTokenSerializer
 from user.serializers import UserSerializer
@@ -17,17 +19,23 @@ class CreateUserView(generics.CreateAPIView):
 
 
 class CreateTokenView(ObtainAuthToken):
-    """Create auth token for user"""
+    """Create auth token for user, replacing an expired one"""
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = TokenUsage.objects.issue(serializer.validated_data["user"])
+        return Response({"token": token.key})
+
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):